@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import json
+import queue
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import degrees
+
+
+class UnresolvedName(LookupError):
+    """
+    Raised for a name that is unknown or ambiguous, carrying the
+    people it most likely refers to.
+    """
+
+    def __init__(self, message, candidates):
+        super().__init__(message)
+        self.candidates = candidates
+
+
+def resolve(name):
+    """
+    Returns the person_id for a name without prompting,
+    or raises UnresolvedName if the name is unknown or ambiguous.
+    """
+    person_id = degrees.person_id_for_name(name, interactive=False)
+    if person_id is not None:
+        return person_id
+    candidates = [
+        {"id": person_id,
+         "name": degrees.people[person_id]["name"],
+         "birth": degrees.people[person_id]["birth"]}
+        for person_id in degrees.candidates_for_name(name)
+    ]
+    if degrees.name_index.exact(name):
+        raise UnresolvedName(f"ambiguous name: {name}", candidates)
+    raise UnresolvedName(f"person not found: {name}", candidates)
+
+
+def answer(line, received=None):
+    """
+    Answers one "source,target" query line, returning a result dict
+    with the degrees of separation, the path and the query latency,
+    measured from the `received` perf_counter time when given.
+    """
+    start = time.perf_counter() if received is None else received
+    result = {"query": line}
+    try:
+        fields = next(csv.reader([line]))
+        if len(fields) != 2:
+            raise ValueError("expected source,target")
+        source, target = (resolve(field.strip()) for field in fields)
+        path = degrees.shortest_path(source, target)
+        result["degrees"] = None if path is None else len(path)
+        result["path"] = path
+    except UnresolvedName as e:
+        result["error"] = str(e)
+        result["candidates"] = e.candidates
+    except ValueError as e:
+        result["error"] = str(e)
+    result["latency_ms"] = 1000 * (time.perf_counter() - start)
+    return result
+
+
+def run(lines, workers):
+    """
+    Answers every non-blank query line across a pool of worker threads
+    sharing the loaded graph, yielding results in input order.
+
+    A reader thread submits queries as they arrive, with at most about
+    2 * workers waiting to be yielded, so results stream out before the
+    input ends and a long file is never queued up in memory.
+    """
+    pending = queue.Queue(maxsize=2 * workers)
+    errors = []
+
+    def read():
+        try:
+            for line in lines:
+                query = line.strip()
+                if query:
+                    received = time.perf_counter()
+                    pending.put(executor.submit(answer, query, received))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            pending.put(None)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        threading.Thread(target=read, daemon=True).start()
+        while True:
+            future = pending.get()
+            if future is None:
+                break
+            yield future.result()
+    if errors:
+        raise errors[0]
+
+
+def summarize(latencies, elapsed):
+    """
+    Returns a one-line summary of the query latencies in milliseconds.
+    """
+    if not latencies:
+        return "0 queries."
+    latencies = sorted(latencies)
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    return (f"{len(latencies)} queries in {elapsed:.3f}s "
+            f"({len(latencies) / elapsed:.1f}/s), "
+            f"mean {sum(latencies) / len(latencies):.3f}ms, "
+            f"p50 {percentile(0.50):.3f}ms, p99 {percentile(0.99):.3f}ms, "
+            f"max {latencies[-1]:.3f}ms")
+
+
+class QueryHandler(socketserver.StreamRequestHandler):
+    """
+    Answers one JSON result line for each "source,target" line received.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            query = line.decode("utf-8").strip()
+            if not query:
+                continue
+            received = time.perf_counter()
+            result = self.server.executor.submit(answer, query, received).result()
+            self.wfile.write(json.dumps(result).encode("utf-8") + b"\n")
+
+
+class QueryServer(socketserver.ThreadingTCPServer):
+    """
+    Serves queries from many connections on one shared worker pool.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, workers):
+        super().__init__(address, QueryHandler)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees of separation queries per load.")
+    degrees.add_arguments(parser)
+    parser.add_argument("--file", default="-",
+                        help="file of source,target name pairs, - for stdin")
+    parser.add_argument("--serve", type=int, metavar="PORT",
+                        help="serve queries on a local TCP port instead")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="number of worker threads answering queries")
+    args = parser.parse_args()
+    degrees.setup(args, log=sys.stderr)
+
+    if args.serve is not None:
+        with QueryServer(("127.0.0.1", args.serve), args.workers) as server:
+            print(f"Serving on port {args.serve}.", file=sys.stderr)
+            server.serve_forever()
+        return
+
+    f = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+    with f:
+        latencies = []
+        start = time.perf_counter()
+        for result in run(f, args.workers):
+            latencies.append(result["latency_ms"])
+            print(json.dumps(result), flush=True)
+    print(summarize(latencies, time.perf_counter() - start), file=sys.stderr)
+    if degrees.cache is not None:
+        print(degrees.cache.stats(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import time
+
+import degrees
+
+
+def sample_pairs(count, seed):
+    """
+    Returns `count` random (source, target) pairs of distinct person ids.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    pairs = []
+    while len(pairs) < count:
+        source, target = rng.sample(person_ids, 2)
+        pairs.append((source, target))
+    return pairs
+
+
+def time_search(function, pairs):
+    """
+    Runs a search over every pair and returns its total time in seconds
+    together with the path length found for each pair.
+    """
+    lengths = []
+    start = time.perf_counter()
+    for source, target in pairs:
+        path = function(source, target)
+        lengths.append(None if path is None else len(path))
+    return time.perf_counter() - start, lengths
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare shortest_path search algorithms.")
+    degrees.add_arguments(parser)
+    parser.add_argument("--pairs", type=int, default=100,
+                        help="number of random person pairs to query")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    degrees.setup(args)
+
+    pairs = sample_pairs(args.pairs, args.seed)
+    results = {}
+    for name, function in degrees.SEARCHES.items():
+        if name in ("alt", "parallel") and degrees.graph is None:
+            # These searches only run over the compact graph
+            continue
+        elapsed, lengths = time_search(function, pairs)
+        results[name] = lengths
+        print(f"{name:>14}: {elapsed:8.3f}s total, "
+              f"{1000 * elapsed / len(pairs):8.3f}ms per query")
+
+    # Every algorithm must agree with the plain breadth-first search
+    expected = results["bfs"]
+    for name, lengths in results.items():
+        mismatches = sum(a != b for a, b in zip(expected, lengths))
+        if mismatches:
+            print(f"WARNING: {name} disagrees with bfs on {mismatches} pairs")
+
+
+if __name__ == "__main__":
+    main()
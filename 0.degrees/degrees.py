@@ -1,10 +1,20 @@
 #!/usr/bin/env python3
 
+import argparse
+import atexit
 import csv
+import os
+from array import array
 import sys
 from typing import Counter
 
-from util import Node, StackFrontier, QueueFrontier
+import hubs
+import snapshot
+from landmarks import LANDMARKS, Landmarks
+from graph import CompactGraph, intern
+from nameindex import NameIndex
+from parallel import ParallelSearch
+from util import Node, QueueFrontier, DequeQueueFrontier, PathCache
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -15,11 +25,65 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Integer-indexed co-star graph, used instead of the movies and stars
+# sets when data is loaded with compact=True
+graph = None
 
-def load_data(directory):
+# Precomputed searches from hub people, consulted by shortest_path
+# before searching when loaded with --hubs
+hub_table = None
+
+# NameIndex over the keys of names, built by load_data
+name_index = None
+
+# Landmarks guiding the "alt" search, selected by setup
+landmarks = None
+
+# ParallelSearch and its process pool behind the "parallel" search,
+# started by setup and kept until exit
+parallel = None
+
+# PathCache of recent shortest_path results, enabled with --cache
+cache = None
+
+# Name of the entry in SEARCHES used by shortest_path
+search = "bfs"
+
+
+def load_data(directory, compact=False, use_snapshot=False):
     """
     Load data from CSV files into memory.
+
+    With compact set, star credits are not kept as sets in `people` and
+    `movies` but in an integer-indexed CompactGraph stored in `graph`.
+
+    With use_snapshot set, the compact data is loaded from the directory's
+    binary snapshot instead, which is (re)built from the CSV files
+    whenever it is missing or out of date.
     """
+    global names, people, movies, graph, name_index
+
+    loaded = snapshot.load(directory) if use_snapshot else None
+    if loaded is not None:
+        names, people, movies, graph = loaded
+    else:
+        _load_csv(directory, compact or use_snapshot)
+        if use_snapshot:
+            try:
+                snapshot.build(directory, names, people, movies, graph)
+            except OSError:
+                pass
+
+    name_index = NameIndex(names, weight=movie_count)
+
+
+def _load_csv(directory, compact):
+    """
+    Load the CSV files into `names`, `people` and `movies`,
+    and into `graph` when compact is set.
+    """
+    global graph
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -27,8 +91,9 @@ def load_data(directory):
             people[row["id"]] = {
                 "name": row["name"],
                 "birth": row["birth"],
-                "movies": set()
             }
+            if not compact:
+                people[row["id"]]["movies"] = set()
             if row["name"].lower() not in names:
                 names[row["name"].lower()] = {row["id"]}
             else:
@@ -41,8 +106,13 @@ def load_data(directory):
             movies[row["id"]] = {
                 "title": row["title"],
                 "year": row["year"],
-                "stars": set()
             }
+            if not compact:
+                movies[row["id"]]["stars"] = set()
+
+    if compact:
+        graph = _load_graph(directory)
+        return
 
     # Load stars
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
@@ -55,15 +125,99 @@ def load_data(directory):
                 pass
 
 
-def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+def _load_graph(directory):
+    """
+    Loads stars.csv into a CompactGraph over the already loaded
+    people and movies.
+    """
+    person_ids = list(people)
+    movie_ids = list(movies)
+    person_index = intern(person_ids)
+    movie_index = intern(movie_ids)
+    edge_people = array("i")
+    edge_movies = array("i")
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                person = person_index[row["person_id"]]
+                movie = movie_index[row["movie_id"]]
+            except KeyError:
+                continue
+            edge_people.append(person)
+            edge_movies.append(movie)
+    return CompactGraph.from_edges(person_ids, movie_ids, edge_people, edge_movies,
+                                   person_index, movie_index)
+
+
+def add_arguments(parser):
+    """
+    Adds the data loading and search options shared by the degrees commands.
+    """
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--search", choices=sorted(SEARCHES), default="bfs",
+                        help="search algorithm used by shortest_path")
+    parser.add_argument("--compact", action="store_true",
+                        help="load stars into a compact integer-indexed graph")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="load compact data from a cached binary snapshot")
+    parser.add_argument("--hubs", action="store_true",
+                        help="answer queries involving hub people from the "
+                             "table precomputed by hubs.py")
+    parser.add_argument("--cache", type=int, default=0, metavar="SIZE",
+                        help="cache up to SIZE recent shortest paths")
+    parser.add_argument("--landmarks", type=int, default=LANDMARKS,
+                        metavar="K",
+                        help="number of landmarks used by the alt search")
+    parser.add_argument("--processes", type=int, default=None, metavar="N",
+                        help="worker processes used by the parallel search "
+                             "(default: one per CPU)")
+
+
+def setup(args, log=None):
+    """
+    Selects the search algorithm and loads the data
+    as requested by the options from add_arguments.
+    """
+    global search, cache
+    search = args.search
+    if args.cache > 0:
+        cache = PathCache(args.cache)
 
     # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    print("Loading data...", file=log)
+    load_data(args.directory,
+              compact=(args.compact or args.hubs
+                       or args.search in ("alt", "parallel")),
+              use_snapshot=args.snapshot)
+    print("Data loaded.", file=log)
+
+    table = None
+    if args.hubs or args.search == "alt":
+        table = hubs.load(args.directory, graph)
+
+    if args.search == "alt":
+        # The hub table already holds the distances from the people with
+        # the most movies, so only search when it is missing or too small
+        global landmarks
+        landmarks = (Landmarks.from_table(graph, table, args.landmarks)
+                     or Landmarks.select(graph, args.landmarks))
+
+    if args.search == "parallel":
+        _start_parallel(args.processes)
+
+    if args.hubs:
+        global hub_table
+        hub_table = table
+        if hub_table is None:
+            print("No up to date hub table, run hubs.py first.", file=log)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Find the degrees of separation between two people.")
+    add_arguments(parser)
+    setup(parser.parse_args())
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -94,10 +248,62 @@ def shortest_path(source, target):
 
     If no possible path, returns None.
     """
+    if cache is None:
+        return find_path(source, target)
+    path = cache.get(source, target)
+    if path is PathCache.MISS:
+        path = find_path(source, target)
+        cache.put(source, target, path)
+    return path
+
+
+def find_path(source, target):
+    """
+    Answers a shortest_path query from the hub table if it can,
+    or else with the selected search algorithm.
+    """
+    if hub_table is not None:
+        source_index = graph.person_index[source]
+        target_index = graph.person_index[target]
+        if hub_table.covers(source_index, target_index):
+            path = hub_table.shortest_path(source_index, target_index)
+            return _path_ids(path)
+    return SEARCHES[search](source, target)
+
+
+def breadth_first_search(source, target, stats=None):
+    """
+    Finds the shortest path by expanding a single queue frontier
+    outwards from the source until the target is reached.
+
+    The number of people expanded is stored in stats["expanded"]
+    when a stats dict is given.
+    """
+    if graph is not None:
+        path = graph.shortest_path(graph.person_index[source],
+                                   graph.person_index[target], stats)
+        return _path_ids(path)
+    return _frontier_search(source, target, DequeQueueFrontier(), stats)
+
+
+def list_breadth_first_search(source, target, stats=None):
+    """
+    Finds the shortest path with the original list-backed QueueFrontier,
+    kept as the baseline for benchmark.py.
+    """
+    return _frontier_search(source, target, QueueFrontier(), stats)
+
+
+def _frontier_search(source, target, frontier, stats):
+    """
+    Expands an empty queue frontier outwards from the source
+    until the target is reached.
+    """
     begin = Node(source, None, None)
-    frontier = QueueFrontier()
     frontier.add(begin)
     nodesExplored = set()
+    if stats is not None:
+        stats["expanded"] = 0
     
     if source == target:
         return None
@@ -106,6 +312,8 @@ def shortest_path(source, target):
             return None
         node = frontier.remove()
         nodesExplored.add(node.state)
+        if stats is not None:
+            stats["expanded"] += 1
         for movie_id, person_id in neighbors_for_person(node.state):
             if person_id not in nodesExplored and not frontier.contains_state(person_id):
                 child = Node(person_id, node, movie_id)
@@ -120,15 +328,142 @@ def shortest_path(source, target):
                 frontier.add(child)
 
 
-def person_id_for_name(name):
+def _path_ids(path):
+    """
+    Converts a CompactGraph path of indices back to IMDB ids.
+    """
+    if path is None:
+        return None
+    return [(graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in path]
+
+
+def bidirectional_search(source, target):
+    """
+    Finds the shortest path by growing one breadth-first frontier from
+    the source and one from the target, always expanding a full level
+    of the smaller frontier, until the two searches meet in the middle.
+    """
+    if source == target:
+        return None
+
+    # Maps each reached person to the (movie_id, person_id) step that
+    # leads back towards the source (forward) or the target (backward)
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        expand_forward = len(forward_frontier) <= len(backward_frontier)
+        if expand_forward:
+            frontier, reached, other = forward_frontier, forward, backward
+        else:
+            frontier, reached, other = backward_frontier, backward, forward
+
+        # Expand the whole level so the meeting point found is the closest
+        meeting = None
+        next_frontier = []
+        for person_id in frontier:
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id in reached:
+                    continue
+                reached[neighbor_id] = (movie_id, person_id)
+                next_frontier.append(neighbor_id)
+                if neighbor_id in other and meeting is None:
+                    meeting = neighbor_id
+
+        if meeting is not None:
+            return _join_paths(forward, backward, meeting)
+
+        if expand_forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+
+def _join_paths(forward, backward, meeting):
+    """
+    Builds the source to target path through the person where
+    a bidirectional search met.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        path.append((movie_id, person_id))
+    return path
+
+
+def alt_search(source, target, stats=None):
+    """
+    Finds the shortest path with A* search guided by landmark distances.
+    Requires data loaded with compact=True.
+    """
+    global landmarks
+    if landmarks is None:
+        landmarks = Landmarks.select(graph, LANDMARKS)
+    path = landmarks.shortest_path(graph.person_index[source],
+                                   graph.person_index[target], stats)
+    return _path_ids(path)
+
+
+def parallel_search(source, target):
+    """
+    Finds the shortest path with the level-synchronous breadth-first
+    search of parallel.py, which returns the same path as "bfs" over
+    the compact graph. Requires data loaded with compact=True.
+    """
+    if parallel is None:
+        _start_parallel(None)
+    path = parallel.shortest_path(graph.person_index[source],
+                                  graph.person_index[target])
+    return _path_ids(path)
+
+
+def _start_parallel(processes):
+    """
+    Starts the process pool of the parallel search, shutting it down
+    and releasing its shared memory when the program exits.
+    """
+    global parallel
+    parallel = ParallelSearch(graph, processes or os.cpu_count())
+    atexit.register(parallel.close)
+
+
+# Search algorithms that shortest_path can dispatch to
+SEARCHES = {
+    "bfs": breadth_first_search,
+    "bfs-list": list_breadth_first_search,
+    "bidirectional": bidirectional_search,
+    "alt": alt_search,
+    "parallel": parallel_search,
+}
+
+
+def person_id_for_name(name, interactive=True):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    Ambiguities are resolved by prompting unless interactive is False,
+    in which case only an unambiguous name resolves to an id.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = name_index.exact(name)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
+        if not interactive:
+            return None
         print(f"Which '{name}'?")
         for person_id in person_ids:
             person = people[person_id]
@@ -146,11 +481,33 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def candidates_for_name(name, limit=10):
+    """
+    Returns up to `limit` person_ids ranked by how well they match a
+    possibly misspelled or partial name, exact matches first and people
+    with more movies ahead of others with the same name.
+    """
+    return name_index.candidates(name, limit)
+
+
+def movie_count(person_id):
+    """
+    Returns the number of movies a person starred in.
+    """
+    if graph is not None:
+        return graph.degree(graph.person_index[person_id])
+    return len(people[person_id]["movies"])
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return {(graph.movie_ids[movie], graph.person_ids[person])
+                for movie, person in graph.neighbors(graph.person_index[person_id])}
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,147 @@
+from array import array
+
+
+class CompactGraph():
+    """
+    Co-star graph with person and movie ids interned to dense ints.
+
+    Adjacency is kept in CSR form: the movies of person p are
+    person_movies[person_offsets[p]:person_offsets[p + 1]] and the stars
+    of movie m are movie_stars[movie_offsets[m]:movie_offsets[m + 1]].
+    """
+
+    def __init__(self, person_ids, movie_ids, person_offsets, person_movies,
+                 movie_offsets, movie_stars, person_index=None, movie_index=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_index = person_index or intern(person_ids)
+        self.movie_index = movie_index or intern(movie_ids)
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+
+    @classmethod
+    def from_edges(cls, person_ids, movie_ids, edge_people, edge_movies,
+                   person_index=None, movie_index=None):
+        """
+        Builds a graph from parallel arrays of (person index, movie index)
+        star credits.
+        """
+        person_offsets, person_movies = _csr(len(person_ids), edge_people, edge_movies)
+        movie_offsets, movie_stars = _csr(len(movie_ids), edge_movies, edge_people)
+        return cls(person_ids, movie_ids, person_offsets, person_movies,
+                   movie_offsets, movie_stars, person_index, movie_index)
+
+    def degree(self, person):
+        """
+        Returns the number of movies a person index starred in.
+        """
+        return self.person_offsets[person + 1] - self.person_offsets[person]
+
+    def movies_of(self, person):
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_of(self, movie):
+        return self.movie_stars[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def neighbors(self, person):
+        """
+        Yields (movie index, person index) pairs for people
+        who starred with a given person index.
+        """
+        for movie in self.movies_of(person):
+            for star in self.stars_of(movie):
+                yield movie, star
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie index, person index) pairs
+        that connect the source index to the target index.
+
+        If no possible path, returns None.
+        """
+        if source == target:
+            return None
+        parents, vias = self.breadth_first(source, target, stats)
+        if parents[target] == -1:
+            return None
+        return self.path_to(parents, vias, target)
+
+    def breadth_first(self, source, target=-1, stats=None):
+        """
+        Runs a breadth-first search from the source index, stopping early
+        once the target index is reached.
+
+        Returns (parents, vias) arrays holding, for every reached person,
+        the previous person on its shortest path and the movie linking them.
+        Unreached people have a parent of -1. The number of people expanded
+        is stored in stats["expanded"] when a stats dict is given.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+
+        parents = array("i", [-1]) * len(self.person_ids)
+        vias = array("i", [-1]) * len(self.person_ids)
+        # Every star of a movie is reached the first time the movie is
+        # expanded, so each movie only ever needs expanding once
+        expanded = bytearray(len(self.movie_ids))
+        parents[source] = source
+        queue = [source]
+        for count, person in enumerate(queue, 1):
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                if expanded[movie]:
+                    continue
+                expanded[movie] = 1
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    star = movie_stars[j]
+                    if parents[star] == -1:
+                        parents[star] = person
+                        vias[star] = movie
+                        if star == target:
+                            if stats is not None:
+                                stats["expanded"] = count
+                            return parents, vias
+                        queue.append(star)
+        if stats is not None:
+            stats["expanded"] = len(queue)
+        return parents, vias
+
+    def path_to(self, parents, vias, target):
+        """
+        Walks the parents arrays from the target back to the search root.
+        """
+        path = []
+        person = target
+        while parents[person] != person:
+            path.append((vias[person], person))
+            person = parents[person]
+        path.reverse()
+        return path
+
+
+def intern(ids):
+    """
+    Maps every id to its position in the list of ids.
+    """
+    return {id_: i for i, id_ in enumerate(ids)}
+
+
+def _csr(rows, edge_rows, edge_columns):
+    """
+    Groups edges by row with a counting sort, returning (offsets, columns).
+    """
+    offsets = array("i", [0]) * (rows + 1)
+    for row in edge_rows:
+        offsets[row + 1] += 1
+    for row in range(rows):
+        offsets[row + 1] += offsets[row]
+    columns = array("i", [0]) * len(edge_rows)
+    position = array("i", offsets)
+    for row, column in zip(edge_rows, edge_columns):
+        columns[position[row]] = column
+        position[row] += 1
+    return offsets, columns
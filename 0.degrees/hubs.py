@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+from array import array
+
+import snapshot
+
+FILENAME = "degrees.hubs"
+
+
+class HubTable():
+    """
+    Precomputed single-source breadth-first searches from hub people.
+
+    For every hub index the table holds, for every person index, the
+    distance from the hub and the parent person and linking movie on a
+    shortest path back to the hub, so any query involving a hub is
+    answered by walking parents instead of searching.
+    """
+
+    def __init__(self, hubs, distances, parents, vias):
+        self.hubs = hubs
+        self.rows = {hub: row for row, hub in enumerate(hubs)}
+        self.distances = distances
+        self.parents = parents
+        self.vias = vias
+
+    def covers(self, source, target):
+        """
+        Returns True if the table can answer a query between two person indices.
+        """
+        return source in self.rows or target in self.rows
+
+    def distance(self, source, target):
+        """
+        Returns the degrees of separation between a hub and another
+        person index, or -1 if they are not connected.
+        """
+        if source in self.rows:
+            return self.distances[self.rows[source]][target]
+        return self.distances[self.rows[target]][source]
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie index, person index) pairs
+        connecting two person indices, at least one of which is a hub.
+
+        If no possible path, returns None.
+        """
+        if source == target:
+            return None
+        if source in self.rows:
+            row = self.rows[source]
+            parents, vias = self.parents[row], self.vias[row]
+            if parents[target] == -1:
+                return None
+            path = []
+            person = target
+            while person != source:
+                path.append((vias[person], person))
+                person = parents[person]
+            path.reverse()
+            return path
+
+        # Walking from the source towards the target hub already
+        # visits the people in path order
+        row = self.rows[target]
+        parents, vias = self.parents[row], self.vias[row]
+        if parents[source] == -1:
+            return None
+        path = []
+        person = source
+        while person != target:
+            path.append((vias[person], parents[person]))
+            person = parents[person]
+        return path
+
+
+def single_source(graph, hub):
+    """
+    Runs a full breadth-first search from a hub person index, returning
+    its (distances, parents, vias) arrays.
+    """
+    parents, vias = graph.breadth_first(hub)
+    distances = array("h", [-1]) * len(parents)
+    distances[hub] = 0
+    chain = []
+    for person in range(len(parents)):
+        # Climb to the nearest ancestor with a known distance,
+        # then fill in the distances on the way back down
+        while distances[person] == -1 and parents[person] != -1:
+            chain.append(person)
+            person = parents[person]
+        distance = distances[person]
+        while chain:
+            distance += 1
+            distances[chain.pop()] = distance
+    return distances, parents, vias
+
+
+def precompute(graph, hubs):
+    """
+    Builds a HubTable for a list of hub person indices.
+    """
+    distances, parents, vias = [], [], []
+    for hub in hubs:
+        hub_distances, hub_parents, hub_vias = single_source(graph, hub)
+        distances.append(hub_distances)
+        parents.append(hub_parents)
+        vias.append(hub_vias)
+    return HubTable(hubs, distances, parents, vias)
+
+
+def top_hubs(graph, count):
+    """
+    Returns the person indices of the `count` people with the most movies.
+    """
+    people = range(len(graph.person_ids))
+    return sorted(people, key=graph.degree, reverse=True)[:count]
+
+
+def save(directory, graph, table):
+    """
+    Writes a HubTable next to the CSV files it was computed from.
+    """
+    header = {
+        "sources": snapshot.fingerprint(directory),
+        "hubs": [graph.person_ids[hub] for hub in table.hubs],
+    }
+    arrays = []
+    for row in range(len(table.hubs)):
+        arrays += [table.distances[row], table.parents[row], table.vias[row]]
+    snapshot.write_arrays(os.path.join(directory, FILENAME), header, arrays)
+
+
+def load(directory, graph):
+    """
+    Memory-maps the HubTable of a data directory, or returns None
+    if there is none or the CSV files have changed since it was built.
+    """
+    loaded = snapshot.read_arrays(os.path.join(directory, FILENAME))
+    if loaded is None:
+        return None
+    header, arrays = loaded
+    if (not isinstance(header, dict)
+            or header.get("sources") != snapshot.fingerprint(directory)):
+        return None
+    hubs = [graph.person_index[person_id] for person_id in header["hubs"]]
+    return HubTable(hubs, arrays[0::3], arrays[1::3], arrays[2::3])
+
+
+def main():
+    import degrees
+
+    parser = argparse.ArgumentParser(
+        description="Precompute shortest paths from hub people.")
+    degrees.add_arguments(parser)
+    parser.add_argument("--top", type=int, default=100,
+                        help="use the people with the most movies as hubs")
+    parser.add_argument("--names", nargs="+", metavar="NAME",
+                        help="use these people as hubs instead")
+    args = parser.parse_args()
+    if not args.snapshot:
+        args.compact = True
+    degrees.setup(args)
+    graph = degrees.graph
+
+    if args.names:
+        hubs = []
+        for name in args.names:
+            person_id = degrees.person_id_for_name(name)
+            if person_id is None:
+                raise SystemExit(f"Person not found: {name}")
+            hubs.append(graph.person_index[person_id])
+    else:
+        hubs = top_hubs(graph, args.top)
+
+    print(f"Searching from {len(hubs)} hubs...")
+    save(args.directory, graph, precompute(graph, hubs))
+    print(f"Hub table written to {os.path.join(args.directory, FILENAME)}.")
+
+
+if __name__ == "__main__":
+    main()
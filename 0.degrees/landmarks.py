@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import argparse
+import heapq
+import time
+
+import hubs
+
+# Number of landmarks used when none is given
+LANDMARKS = 16
+
+
+class Landmarks():
+    """
+    A* search over a CompactGraph guided by landmark distances (ALT).
+
+    For every landmark L the triangle inequality gives
+    |d(L, target) - d(L, person)| <= d(person, target), so the largest
+    such bound over all landmarks is an admissible, consistent heuristic.
+    """
+
+    def __init__(self, graph, table):
+        self.graph = graph
+        self.table = table
+
+    @classmethod
+    def select(cls, graph, count):
+        """
+        Uses the `count` people with the most movies as landmarks.
+        """
+        return cls(graph, hubs.precompute(graph, hubs.top_hubs(graph, count)))
+
+    @classmethod
+    def from_table(cls, graph, table, count):
+        """
+        Uses the first `count` hubs of a HubTable saved by hubs.py as
+        landmarks, reusing its distances instead of searching again,
+        or returns None if the table has fewer hubs than that.
+        """
+        if table is None or len(table.hubs) < count:
+            return None
+        return cls(graph, hubs.HubTable(table.hubs[:count], table.distances[:count],
+                                        table.parents[:count], table.vias[:count]))
+
+    def bounds(self, target):
+        """
+        Returns a heuristic function estimating the distance from
+        a person index to the target index, or None for people that
+        cannot be connected to the target at all.
+        """
+        columns = [(distances, distances[target]) for distances in self.table.distances]
+
+        def heuristic(person):
+            best = 0
+            for distances, to_target in columns:
+                to_person = distances[person]
+                if (to_person == -1) != (to_target == -1):
+                    # The landmark reaches only one of them,
+                    # so they lie in different components
+                    return None
+                if to_person != -1:
+                    best = max(best, abs(to_target - to_person))
+            return best
+
+        return heuristic
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie index, person index) pairs
+        that connect the source index to the target index.
+
+        If no possible path, returns None. The number of people expanded
+        is stored in stats["expanded"] when a stats dict is given.
+        """
+        expanded = 0
+        try:
+            if source == target:
+                return None
+            heuristic = self.bounds(target)
+            estimate = heuristic(source)
+            if estimate is None:
+                return None
+
+            graph = self.graph
+            costs = {source: 0}
+            steps = {source: None}
+            closed = set()
+            heap = [(estimate, 0, source)]
+            while heap:
+                _, negative_cost, person = heapq.heappop(heap)
+                if person in closed:
+                    continue
+                if person == target:
+                    return self._path(steps, target)
+                closed.add(person)
+                expanded += 1
+                cost = 1 - negative_cost
+                for movie, star in graph.neighbors(person):
+                    if star in closed or costs.get(star, cost + 1) <= cost:
+                        continue
+                    estimate = heuristic(star)
+                    if estimate is None:
+                        continue
+                    costs[star] = cost
+                    steps[star] = (movie, person)
+                    # Ties prefer the deeper person, who is nearer the target
+                    heapq.heappush(heap, (cost + estimate, -cost, star))
+            return None
+        finally:
+            if stats is not None:
+                stats["expanded"] = expanded
+
+    def _path(self, steps, target):
+        path = []
+        person = target
+        while steps[person] is not None:
+            movie, parent = steps[person]
+            path.append((movie, person))
+            person = parent
+        path.reverse()
+        return path
+
+
+def main():
+    import benchmark
+    import degrees
+
+    parser = argparse.ArgumentParser(
+        description="Compare landmark A* search with breadth-first search.")
+    degrees.add_arguments(parser)
+    parser.add_argument("--pairs", type=int, default=100,
+                        help="number of random person pairs to query")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    args.search = "alt"
+    degrees.setup(args)
+
+    pairs = benchmark.sample_pairs(args.pairs, args.seed)
+    _, expected = benchmark.time_search(degrees.breadth_first_search, pairs)
+    for name in ["bfs", "alt"]:
+        search = degrees.SEARCHES[name]
+        expanded = 0
+        lengths = []
+        start = time.perf_counter()
+        for source, target in pairs:
+            stats = {}
+            path = search(source, target, stats=stats)
+            expanded += stats["expanded"]
+            lengths.append(None if path is None else len(path))
+        elapsed = time.perf_counter() - start
+        mismatches = sum(a != b for a, b in zip(expected, lengths))
+        print(f"{name:>4}: {expanded / len(pairs):12.1f} people expanded per query, "
+              f"{elapsed:8.3f}s total"
+              + (f", {mismatches} path lengths differ" if mismatches else ""))
+
+
+if __name__ == "__main__":
+    main()
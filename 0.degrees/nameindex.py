@@ -0,0 +1,98 @@
+import math
+from array import array
+from bisect import bisect_left
+
+
+def trigrams(name):
+    """
+    Returns the set of 3-character substrings of a padded name.
+    """
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex():
+    """
+    Index over lowercase names supporting exact, prefix and fuzzy lookup.
+
+    Names are kept in a sorted list for prefix search by bisection, and
+    every trigram maps to an array of the positions of the names
+    containing it for fuzzy matching.
+    """
+
+    def __init__(self, names, weight=None):
+        """
+        Builds the index from a dict mapping lowercase names to sets of
+        ids. Ids sharing a name are ranked by descending `weight(id)`.
+        """
+        self.names = names
+        self.weight = weight or (lambda id_: 0)
+        self.sorted_names = sorted(names)
+        self.postings = {}
+        for position, name in enumerate(self.sorted_names):
+            for gram in trigrams(name):
+                if gram not in self.postings:
+                    self.postings[gram] = array("i")
+                self.postings[gram].append(position)
+
+    def exact(self, name):
+        return self._ranked(self.names.get(name.lower(), ()))
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` names starting with a prefix, in sorted order.
+        """
+        prefix = prefix.lower()
+        matches = []
+        i = bisect_left(self.sorted_names, prefix)
+        while (i < len(self.sorted_names) and len(matches) < limit
+               and self.sorted_names[i].startswith(prefix)):
+            matches.append(self.sorted_names[i])
+            i += 1
+        return matches
+
+    def fuzzy(self, name, limit=10, threshold=0.5):
+        """
+        Returns up to `limit` (similarity, name) pairs, most similar first,
+        scoring names by the Jaccard similarity of their trigram sets.
+        """
+        grams = trigrams(name.lower())
+        # A name at least `threshold` similar shares that fraction of the
+        # query's trigrams, so it must contain one of the rarest few of them
+        needed = max(1, math.ceil(threshold * len(grams)))
+        rarest = sorted(grams, key=lambda gram: len(self.postings.get(gram, ())))
+        positions = set()
+        for gram in rarest[:len(grams) - needed + 1]:
+            positions.update(self.postings.get(gram, ()))
+        scored = []
+        for position in positions:
+            match = self.sorted_names[position]
+            match_grams = trigrams(match)
+            shared = len(grams & match_grams)
+            similarity = shared / (len(grams) + len(match_grams) - shared)
+            if similarity >= threshold:
+                scored.append((similarity, match))
+        scored.sort(key=lambda match: (-match[0], match[1]))
+        return scored[:limit]
+
+    def candidates(self, name, limit=10):
+        """
+        Returns up to `limit` ids ranked for a possibly misspelled or
+        partial name: exact matches first, then names it prefixes, then,
+        only if there are still too few, names sharing the most trigrams.
+        """
+        ranked = self.exact(name)
+        seen = {name.lower()}
+        matches = self.prefix(name, limit)
+        if not ranked and len(matches) < limit:
+            matches += [match for _, match in self.fuzzy(name, limit)]
+        for match in matches:
+            if len(ranked) >= limit:
+                break
+            if match not in seen:
+                seen.add(match)
+                ranked += self._ranked(self.names[match])
+        return ranked[:limit]
+
+    def _ranked(self, ids):
+        return sorted(ids, key=lambda id_: (-self.weight(id_), id_))
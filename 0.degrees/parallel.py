@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+
+# CompactGraph arrays shared with the workers, followed by the
+# per-person visited and per-movie expanded flags
+SHARED = ["person_offsets", "person_movies", "movie_offsets", "movie_stars"]
+
+# Views of the shared memory blocks inside a worker process
+_views = None
+
+
+class ParallelSearch():
+    """
+    Level-synchronous breadth-first search over a CompactGraph.
+
+    The graph's adjacency arrays live in shared memory, and every level's
+    frontier is split into contiguous chunks expanded by a process pool.
+    Merging the chunks back in frontier order makes the search find
+    exactly the same path as CompactGraph.shortest_path.
+    """
+
+    def __init__(self, graph, workers, min_chunk=1000):
+        self.graph = graph
+        self.workers = workers
+        self.min_chunk = min_chunk
+        # The visited and expanded flags are shared by every query
+        self.lock = threading.Lock()
+        self.blocks = []
+        for name in SHARED:
+            values = getattr(graph, name)
+            self.blocks.append(_share(memoryview(values).cast("B")))
+        self.blocks.append(SharedMemory(create=True, size=len(graph.person_ids) or 1))
+        self.blocks.append(SharedMemory(create=True, size=len(graph.movie_ids) or 1))
+        layout = [(block.name, len(getattr(graph, name)))
+                  for block, name in zip(self.blocks, SHARED)]
+        layout += [(block.name, None) for block in self.blocks[len(SHARED):]]
+        self.views = [_view(block, length) for block, (_, length)
+                      in zip(self.blocks, layout)]
+        self.pool = multiprocessing.Pool(workers, _initialize, (layout,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+        for view in self.views:
+            view.release()
+        self.views = []
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie index, person index) pairs
+        that connect the source index to the target index.
+
+        If no possible path, returns None.
+        """
+        if source == target:
+            return None
+        with self.lock:
+            return self._search(source, target)
+
+    def _search(self, source, target):
+        visited, expanded = self.views[-2:]
+        visited[:] = bytes(len(visited))
+        expanded[:] = bytes(len(expanded))
+
+        parents = array("i", [-1]) * len(self.graph.person_ids)
+        vias = array("i", [-1]) * len(self.graph.person_ids)
+        parents[source] = source
+        visited[source] = 1
+        frontier = array("i", [source])
+        while frontier:
+            next_frontier = array("i")
+            for stars, starred_parents, starred_vias, movies in self._expand(frontier):
+                for movie in movies:
+                    expanded[movie] = 1
+                for star, parent, via in zip(stars, starred_parents, starred_vias):
+                    if parents[star] != -1:
+                        continue
+                    parents[star] = parent
+                    vias[star] = via
+                    if star == target:
+                        return self.graph.path_to(parents, vias, target)
+                    next_frontier.append(star)
+            for star in next_frontier:
+                visited[star] = 1
+            frontier = next_frontier
+        return None
+
+    def _expand(self, frontier):
+        """
+        Expands one level, returning the results of every chunk in
+        frontier order. Small levels are expanded without the pool.
+        """
+        size = max(self.min_chunk, -(-len(frontier) // self.workers))
+        chunks = [frontier[i:i + size] for i in range(0, len(frontier), size)]
+        if len(chunks) == 1:
+            return [expand(chunks[0], self.views)]
+        return self.pool.map(_expand, chunks)
+
+
+def expand(chunk, views):
+    """
+    Expands a chunk of frontier people in order against the visited and
+    expanded flags as they stood at the start of the level.
+
+    Returns (stars, parents, vias, movies): the first (parent, movie)
+    reaching each unvisited star within the chunk, and the movies expanded.
+    """
+    person_offsets, person_movies, movie_offsets, movie_stars, visited, expanded = views
+    stars, parents, vias, movies = array("i"), array("i"), array("i"), array("i")
+    seen_movies = set()
+    seen_stars = set()
+    for person in chunk:
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            if expanded[movie] or movie in seen_movies:
+                continue
+            seen_movies.add(movie)
+            movies.append(movie)
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                star = movie_stars[j]
+                if visited[star] or star in seen_stars:
+                    continue
+                seen_stars.add(star)
+                stars.append(star)
+                parents.append(person)
+                vias.append(movie)
+    return stars, parents, vias, movies
+
+
+def _expand(chunk):
+    return expand(chunk, _views)
+
+
+def _initialize(layout):
+    global _views
+    _views = []
+    for name, length in layout:
+        block = SharedMemory(name=name)
+        _blocks.append(block)
+        _views.append(_view(block, length))
+
+
+def _share(data):
+    """
+    Copies bytes into a new shared memory block.
+    """
+    block = SharedMemory(create=True, size=len(data) or 1)
+    block.buf[:len(data)] = data
+    return block
+
+
+def _view(block, length):
+    """
+    Returns a shared memory block as an int array of a given length,
+    or as byte flags for a length of None.
+    """
+    if length is None:
+        return block.buf
+    return block.buf[:4 * length].cast("i")
+
+
+# Shared memory blocks a worker process keeps attached for its lifetime
+_blocks = []
+
+
+def main():
+    import benchmark
+    import degrees
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the parallel breadth-first search.")
+    degrees.add_arguments(parser)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=[1, 2, 4, os.cpu_count()],
+                        help="worker counts to measure")
+    parser.add_argument("--pairs", type=int, default=20,
+                        help="number of random person pairs to query")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not args.snapshot:
+        args.compact = True
+    degrees.setup(args)
+    graph = degrees.graph
+
+    pairs = [(graph.person_index[source], graph.person_index[target])
+             for source, target in benchmark.sample_pairs(args.pairs, args.seed)]
+    start = time.perf_counter()
+    expected = [graph.shortest_path(source, target) for source, target in pairs]
+    serial = time.perf_counter() - start
+    print(f"{'serial':>10}: {serial:8.3f}s")
+
+    for workers in args.workers:
+        with ParallelSearch(graph, workers) as search:
+            start = time.perf_counter()
+            paths = [search.shortest_path(source, target) for source, target in pairs]
+            elapsed = time.perf_counter() - start
+        mismatches = sum(a != b for a, b in zip(expected, paths))
+        print(f"{workers:>2} workers: {elapsed:8.3f}s, "
+              f"speedup {serial / elapsed:5.2f}x"
+              + (f", {mismatches} paths differ" if mismatches else ""))
+
+
+if __name__ == "__main__":
+    main()
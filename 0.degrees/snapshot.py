@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph import CompactGraph
+
+MAGIC = b"DEGSNAP"
+VERSION = 2
+
+# Magic, version, length of the marshalled header
+PREAMBLE = struct.Struct("<7sBQ")
+
+FILENAME = "degrees.snapshot"
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# CompactGraph arrays stored after the header, in this order
+ARRAYS = ["person_offsets", "person_movies", "movie_offsets", "movie_stars"]
+
+
+def fingerprint(directory):
+    """
+    Returns the (name, mtime, size) of every CSV file the snapshot is
+    built from, so a snapshot can tell when its sources have changed.
+    """
+    result = []
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        result.append((name, stat.st_mtime_ns, stat.st_size))
+    return result
+
+
+def write_arrays(path, header, arrays):
+    """
+    Writes a marshalled header followed by raw numeric arrays, each aligned
+    to 8 bytes so they can be memory-mapped back in place.
+    """
+    layout = [(values.typecode, len(values)) for values in arrays]
+    blob = marshal.dumps((header, layout))
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(blob)))
+        f.write(blob)
+        for values in arrays:
+            f.write(b"\0" * (-f.tell() % 8))
+            values.tofile(f)
+    os.replace(tmp, path)
+
+
+def read_arrays(path):
+    """
+    Memory-maps a file written by write_arrays.
+
+    Returns (header, arrays) with every array a read-only memoryview
+    into the mapping, or None if the file is missing, from another version,
+    truncated or otherwise unreadable, so callers rebuild it.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    try:
+        with f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size = PREAMBLE.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            return None
+        offset = PREAMBLE.size
+        header, layout = marshal.loads(data[offset:offset + size])
+        offset += size
+        view = memoryview(data)
+        arrays = []
+        for typecode, length in layout:
+            offset += -offset % 8
+            size = array(typecode).itemsize * length
+            if offset + size > len(data):
+                return None
+            arrays.append(view[offset:offset + size].cast(typecode))
+            offset += size
+    except (ValueError, TypeError, EOFError, struct.error):
+        return None
+    return header, arrays
+
+
+def build(directory, names, people, movies, graph):
+    """
+    Writes the loaded names index, people, movies and compact graph
+    to the snapshot file of a data directory.
+    """
+    header = {
+        "sources": fingerprint(directory),
+        "names": names,
+        "people": people,
+        "movies": movies,
+        "person_ids": graph.person_ids,
+        "movie_ids": graph.movie_ids,
+        "person_index": graph.person_index,
+        "movie_index": graph.movie_index,
+    }
+    arrays = [getattr(graph, name) for name in ARRAYS]
+    write_arrays(os.path.join(directory, FILENAME), header, arrays)
+
+
+def load(directory):
+    """
+    Loads the snapshot of a data directory.
+
+    Returns (names, people, movies, graph), or None if there is no snapshot
+    or the CSV files have changed since it was built.
+    """
+    snapshot = read_arrays(os.path.join(directory, FILENAME))
+    if snapshot is None:
+        return None
+    header, arrays = snapshot
+    if (not isinstance(header, dict)
+            or header.get("sources") != fingerprint(directory)):
+        return None
+    graph = CompactGraph(header["person_ids"], header["movie_ids"], *arrays,
+                         header["person_index"], header["movie_index"])
+    return header["names"], header["people"], header["movies"], graph
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python snapshot.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    import degrees
+
+    print("Loading data...")
+    degrees.load_data(directory, compact=True)
+    print("Writing snapshot...")
+    build(directory, degrees.names, degrees.people, degrees.movies, degrees.graph)
+    print(f"Snapshot written to {os.path.join(directory, FILENAME)}.")
+
+
+if __name__ == "__main__":
+    main()
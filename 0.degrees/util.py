@@ -1,3 +1,7 @@
+import threading
+from collections import Counter, OrderedDict, deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +40,98 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    def __init__(self):
+        self.frontier = deque()
+        # Number of nodes in the frontier for each state
+        self.states = Counter()
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] += 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            return self._forget(self.frontier.pop())
+
+    def _forget(self, node):
+        self.states[node.state] -= 1
+        if self.states[node.state] == 0:
+            del self.states[node.state]
+        return node
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            return self._forget(self.frontier.popleft())
+
+
+def reverse_path(source, path):
+    """
+    Reverses a list of (action, state) steps leading away from source
+    into the steps leading from the path's last state back to source.
+    """
+    states = [source] + [state for _, state in path]
+    return [(path[i][0], states[i]) for i in reversed(range(len(path)))]
+
+
+class PathCache():
+    """
+    Bounded least recently used cache of search results keyed on the
+    unordered pair of endpoints, so a cached path also answers the
+    reverse query.
+    """
+
+    # Returned by get when a pair is not cached
+    MISS = object()
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.reverse_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, source, target):
+        key = frozenset((source, target))
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return PathCache.MISS
+            self.entries.move_to_end(key)
+            self.hits += 1
+            cached_source, path = self.entries[key]
+            if cached_source == source or path is None:
+                return path
+            self.reverse_hits += 1
+        return reverse_path(cached_source, path)
+
+    def put(self, source, target, path):
+        key = frozenset((source, target))
+        with self.lock:
+            self.entries[key] = (source, path)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        return (f"cache: {len(self.entries)}/{self.capacity} entries, "
+                f"{self.hits} hits ({self.reverse_hits} reversed), "
+                f"{self.misses} misses, {self.evictions} evictions")
@@ -0,0 +1,258 @@
+"""
+Tic Tac Toe Player on bitboards
+
+Same public functions as tictactoe, with each board held as two 9-bit
+ints: bit 3 * i + j of x (or o) is set when X (or O) occupies (i, j).
+"""
+
+import sys
+import time
+
+import tictactoe
+from tictactoe import X, O, EMPTY, EXACT, LOWER, UPPER, SYMMETRIES
+
+FULL = 0b111111111
+
+# The 8 winning lines as bit masks
+WINS = [
+	0b000000111, 0b000111000, 0b111000000,
+	0b001001001, 0b010010010, 0b100100100,
+	0b100010001, 0b001010100,
+]
+
+# Number of set bits in every 9-bit mask
+COUNTS = [bin(mask).count("1") for mask in range(512)]
+
+# For every symmetry, the image of every 9-bit mask
+PERMUTED = [
+	[sum(1 << symmetry[cell] for cell in range(9) if mask >> cell & 1)
+	 for mask in range(512)]
+	for symmetry in SYMMETRIES
+]
+
+# Maps canonical board encodings to (value, flag) pairs
+table = {}
+
+# Number of positions visited by alphabeta, reset by report
+nodes = 0
+
+
+class Board():
+	"""
+	Immutable pair of X and O bitboards. Indexing gives the rows as
+	lists of X, O and EMPTY, like the nested list boards.
+	"""
+	__slots__ = ("x", "o")
+
+	def __init__(self, x=0, o=0):
+		self.x = x
+		self.o = o
+
+	def __getitem__(self, i):
+		row = []
+		for j in range(3):
+			bit = 1 << (3 * i + j)
+			row.append(X if self.x & bit else O if self.o & bit else EMPTY)
+		return row
+
+	def __eq__(self, other):
+		return isinstance(other, Board) and self.x == other.x and self.o == other.o
+
+	def __hash__(self):
+		return hash((self.x, self.o))
+
+	def __repr__(self):
+		return f"Board({self.x:#011b}, {self.o:#011b})"
+
+
+def from_lists(board):
+	"""
+	Converts a nested list board to a Board.
+	"""
+	code = tictactoe.encode(board)
+	return Board(code & FULL, code >> 9)
+
+
+def initial_state():
+	"""
+	Returns starting state of the board.
+	"""
+	return Board()
+
+
+def player(board):
+	"""
+	Returns player who has the next turn on a board.
+	"""
+	if COUNTS[board.o] < COUNTS[board.x]:
+		return O
+	return X
+
+
+def actions(board):
+	"""
+	Returns set of all possible actions (i, j) available on the board.
+	"""
+	free = ~(board.x | board.o)
+	return [(cell // 3, cell % 3) for cell in range(9) if free >> cell & 1]
+
+
+def result(board, action):
+	"""
+	Returns the board that results from making move (i, j) on the board.
+	"""
+	bit = 1 << (3 * action[0] + action[1])
+	if (board.x | board.o) & bit:
+		raise Exception("invalid action")
+	if COUNTS[board.o] < COUNTS[board.x]:
+		return Board(board.x, board.o | bit)
+	return Board(board.x | bit, board.o)
+
+
+def winner(board):
+	"""
+	Returns the winner of the game, if there is one.
+	"""
+	for mask in WINS:
+		if board.x & mask == mask:
+			return X
+		if board.o & mask == mask:
+			return O
+	return EMPTY
+
+
+def terminal(board):
+	"""
+	Returns True if game is over, False otherwise.
+	"""
+	return (board.x | board.o) == FULL or winner(board) is not EMPTY
+
+
+def utility(board):
+	"""
+	Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+	"""
+	result = winner(board)
+	if result == X:
+		return 1
+	elif result == O:
+		return -1
+	return 0
+
+
+def minimax(board):
+	"""
+	Returns the optimal action for the current player on the board.
+	"""
+	if terminal(board):
+		return None
+	x, o = board.x, board.o
+	x_to_move = COUNTS[o] == COUNTS[x]
+	best_move = None
+	best_value = None
+	for cell in range(9):
+		bit = 1 << cell
+		if (x | o) & bit:
+			continue
+		if x_to_move:
+			value = alphabeta(x | bit, o, -2, 2)
+		else:
+			value = alphabeta(x, o | bit, -2, 2)
+		if best_value is None or (value > best_value if x_to_move else value < best_value):
+			best_move = (cell // 3, cell % 3)
+			best_value = value
+	return best_move
+
+
+def alphabeta(x, o, alpha, beta):
+	"""
+	Returns the minimax value of the bitboards within the (alpha, beta)
+	window, storing every result in the transposition table.
+	"""
+	global nodes
+	nodes += 1
+	for mask in WINS:
+		if x & mask == mask:
+			return 1
+		if o & mask == mask:
+			return -1
+	occupied = x | o
+	if occupied == FULL:
+		return 0
+	key = canonical(x, o)
+	if key in table:
+		value, flag = table[key]
+		if flag == EXACT:
+			return value
+		elif flag == LOWER:
+			alpha = max(alpha, value)
+		else:
+			beta = min(beta, value)
+		if alpha >= beta:
+			return value
+	original_alpha = alpha
+	original_beta = beta
+	if COUNTS[o] == COUNTS[x]:
+		value = -2
+		for cell in range(9):
+			bit = 1 << cell
+			if occupied & bit:
+				continue
+			value = max(value, alphabeta(x | bit, o, alpha, beta))
+			alpha = max(alpha, value)
+			if alpha >= beta:
+				break
+	else:
+		value = 2
+		for cell in range(9):
+			bit = 1 << cell
+			if occupied & bit:
+				continue
+			value = min(value, alphabeta(x, o | bit, alpha, beta))
+			beta = min(beta, value)
+			if alpha >= beta:
+				break
+	# a value outside the original window only bounds the true value
+	if value <= original_alpha:
+		table[key] = (value, UPPER)
+	elif value >= original_beta:
+		table[key] = (value, LOWER)
+	else:
+		table[key] = (value, EXACT)
+	return value
+
+
+def canonical(x, o):
+	"""
+	Returns the smallest encoding of the bitboards under the 8 symmetries,
+	matching tictactoe.canonical for the same position.
+	"""
+	return min(permuted[x] | permuted[o] << 9 for permuted in PERMUTED)
+
+
+def report(board):
+	"""
+	Returns (move, nodes searched, seconds taken) for a minimax call.
+	"""
+	global nodes
+	nodes = 0
+	start = time.perf_counter()
+	move = minimax(board)
+	return move, nodes, time.perf_counter() - start
+
+
+def main():
+	for name, backend, board in [
+		("lists", tictactoe, tictactoe.initial_state()),
+		("bitboard", sys.modules[__name__], initial_state()),
+	]:
+		backend.table.clear()
+		move, searched, seconds = backend.report(board)
+		print(f"{name:>8} cold: {move} after {searched} nodes in {seconds * 1000:.3f}ms "
+			  f"({searched / seconds:,.0f} nodes/s)")
+		move, searched, seconds = backend.report(board)
+		print(f"{name:>8} warm: {move} in {seconds * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,141 @@
+"""
+Tic Tac Toe opening book
+
+Solves every reachable position once and stores the optimal move and
+value of each, folded under the 8 board symmetries, in a compact file.
+"""
+
+import os
+import struct
+import time
+from array import array
+
+import bitboard
+import tictactoe
+
+MAGIC = b"TTTBOOK"
+VERSION = 1
+
+# Magic, version, number of positions
+HEADER = struct.Struct("<7sBI")
+
+FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+# For every symmetry, the cell each transformed cell came from
+INVERSE = [[symmetry.index(cell) for cell in range(9)] for symmetry in tictactoe.SYMMETRIES]
+
+
+class Book():
+	"""
+	Maps canonical positions to their optimal move and value.
+
+	Each entry is one byte: the move's cell in the canonical orientation
+	in the low 4 bits and the value + 1 in the next 2 bits.
+	"""
+
+	def __init__(self, entries):
+		self.entries = entries
+
+	def move(self, board):
+		"""
+		Returns the optimal action for the current player on the board,
+		or None if the board is terminal.
+		"""
+		symmetry, key = orient(board)
+		entry = self.entries.get(key)
+		if entry is None:
+			return None
+		cell = INVERSE[symmetry][entry & 15]
+		return (cell // 3, cell % 3)
+
+	def value(self, board):
+		"""
+		Returns the minimax value of a non-terminal board.
+		"""
+		_, key = orient(board)
+		return (self.entries[key] >> 4) - 1
+
+
+def orient(board):
+	"""
+	Returns (symmetry, key) where key is the smallest encoding of the board
+	and symmetry the index of the symmetry producing it.
+	"""
+	if isinstance(board, bitboard.Board):
+		x, o = board.x, board.o
+	else:
+		code = tictactoe.encode(board)
+		x, o = code & bitboard.FULL, code >> 9
+	return min(
+		((permuted[x] | permuted[o] << 9), symmetry)
+		for symmetry, permuted in enumerate(bitboard.PERMUTED)
+	)[::-1]
+
+
+def solve():
+	"""
+	Enumerates every position reachable from the initial state and
+	returns a dict mapping each non-terminal canonical key to its entry.
+	"""
+	entries = {}
+	stack = [bitboard.initial_state()]
+	while stack:
+		board = stack.pop()
+		if bitboard.terminal(board):
+			continue
+		_, key = orient(board)
+		if key in entries:
+			continue
+		# Solve the canonical orientation so its move needs no remapping
+		board = bitboard.Board(key & bitboard.FULL, key >> 9)
+		move = bitboard.minimax(board)
+		value = bitboard.alphabeta(board.x, board.o, -2, 2)
+		entries[key] = (3 * move[0] + move[1]) | (value + 1) << 4
+		for action in bitboard.actions(board):
+			stack.append(bitboard.result(board, action))
+	return entries
+
+
+def save(entries, path=FILENAME):
+	keys = array("I", sorted(entries))
+	with open(path, "wb") as f:
+		f.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+		keys.tofile(f)
+		f.write(bytes(entries[key] for key in keys))
+
+
+def load(path=FILENAME):
+	"""
+	Loads the book from disk, solving and saving it first if it is
+	missing, truncated or from another version.
+	"""
+	try:
+		with open(path, "rb") as f:
+			data = f.read()
+	except FileNotFoundError:
+		data = b""
+	if len(data) >= HEADER.size:
+		magic, version, count = HEADER.unpack_from(data)
+		if magic == MAGIC and version == VERSION and len(data) == HEADER.size + 5 * count:
+			keys = array("I")
+			keys.frombytes(data[HEADER.size:HEADER.size + 4 * count])
+			return Book(dict(zip(keys, data[HEADER.size + 4 * count:])))
+	entries = solve()
+	save(entries, path)
+	return Book(entries)
+
+
+def main():
+	start = time.perf_counter()
+	entries = solve()
+	solved = time.perf_counter() - start
+	save(entries)
+	print(f"Solved {len(entries)} positions in {solved * 1000:.1f}ms, "
+		  f"{os.path.getsize(FILENAME)} bytes written to {FILENAME}.")
+	start = time.perf_counter()
+	load()
+	print(f"Loaded in {(time.perf_counter() - start) * 1000:.3f}ms.")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,294 @@
+"""
+m,n,k game player
+
+Generalizes tictactoe to boards of any number of rows and columns where
+k in a row wins, such as 4x4 or Gomoku-style 15x15 with k=5. Boards are
+nested lists of X, O and EMPTY like tictactoe's, whose functions remain
+the 3x3, k=3 specialization.
+"""
+
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Score of a won position, less the number of moves taken to win
+WIN = 10 ** 9
+
+# Row and column steps of the four line directions
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+
+class Timeout(Exception):
+	pass
+
+
+class Game():
+	"""
+	Rules and search for an m x n board with k in a row to win.
+	"""
+
+	def __init__(self, rows=3, cols=3, k=3):
+		self.rows = rows
+		self.cols = cols
+		self.k = k
+		# Every run of k cells in a line, for the evaluation function
+		self.windows = []
+		for row in range(rows):
+			for col in range(cols):
+				for dr, dc in DIRECTIONS:
+					end_row = row + dr * (k - 1)
+					end_col = col + dc * (k - 1)
+					if 0 <= end_row < rows and 0 <= end_col < cols:
+						self.windows.append([(row + dr * i) * cols + col + dc * i
+											 for i in range(k)])
+		# Cells next to each cell, for move generation on large boards
+		self.neighbors = []
+		for row in range(rows):
+			for col in range(cols):
+				self.neighbors.append([
+					r * cols + c
+					for r in range(max(0, row - 1), min(rows, row + 2))
+					for c in range(max(0, col - 1), min(cols, col + 2))
+					if (r, c) != (row, col)
+				])
+
+	def initial_state(self):
+		"""
+		Returns starting state of the board.
+		"""
+		return [[EMPTY] * self.cols for _ in range(self.rows)]
+
+	def player(self, board):
+		"""
+		Returns player who has the next turn on a board.
+		"""
+		x = sum(row.count(X) for row in board)
+		o = sum(row.count(O) for row in board)
+		if o < x:
+			return O
+		return X
+
+	def actions(self, board):
+		"""
+		Returns set of all possible actions (i, j) available on the board.
+		"""
+		return [(i, j) for i in range(self.rows) for j in range(self.cols)
+				if board[i][j] == EMPTY]
+
+	def result(self, board, action):
+		"""
+		Returns the board that results from making move (i, j) on the board.
+		"""
+		i, j = action
+		if board[i][j] != EMPTY:
+			raise Exception("invalid action")
+		new_board = [list(row) for row in board]
+		new_board[i][j] = self.player(board)
+		return new_board
+
+	def wins_at(self, board, action):
+		"""
+		Returns True if the piece at (i, j) completes k in a row, checking
+		only the four lines through that cell.
+		"""
+		i, j = action
+		return self._wins_at([cell for row in board for cell in row], i * self.cols + j)
+
+	def winner(self, board):
+		"""
+		Returns the winner of the game, if there is one.
+		"""
+		for window in self.windows:
+			first = board[window[0] // self.cols][window[0] % self.cols]
+			if first != EMPTY and all(
+				board[cell // self.cols][cell % self.cols] == first for cell in window
+			):
+				return first
+		return EMPTY
+
+	def terminal(self, board):
+		"""
+		Returns True if game is over, False otherwise.
+		"""
+		if self.winner(board) != EMPTY:
+			return True
+		return all(cell != EMPTY for row in board for cell in row)
+
+	def utility(self, board):
+		"""
+		Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+		"""
+		result = self.winner(board)
+		if result == X:
+			return 1
+		elif result == O:
+			return -1
+		return 0
+
+	def minimax(self, board, budget=1.0, max_depth=None):
+		"""
+		Returns the best action found for the current player on the board
+		by iterative-deepening alpha-beta search within `budget` seconds.
+
+		The move from the deepest fully searched depth is returned, so
+		positions small enough to search to the end are played optimally.
+		"""
+		move, _ = self.search(board, budget, max_depth)
+		return move
+
+	def search(self, board, budget=1.0, max_depth=None):
+		"""
+		Runs the iterative-deepening search of minimax, returning the best
+		action and the deepest depth completed within the budget.
+		"""
+		if self.terminal(board):
+			return None, 0
+		cells = [cell for row in board for cell in row]
+		empty = cells.count(EMPTY)
+		limit = empty if max_depth is None else min(max_depth, empty)
+		piece = self.player(board)
+		deadline = time.perf_counter() + budget
+		self._deadline = deadline
+		self._nodes = 0
+
+		moves = self._moves(cells)
+		best = moves[0]
+		completed = 0
+		for depth in range(1, limit + 1):
+			try:
+				score, move = self._root(cells, piece, depth, moves)
+			except Timeout:
+				break
+			best = move
+			completed = depth
+			# Search the previous best move first at the next depth
+			moves.remove(move)
+			moves.insert(0, move)
+			if abs(score) > WIN - self.rows * self.cols:
+				break
+		return (best // self.cols, best % self.cols), completed
+
+	def _root(self, cells, piece, depth, moves):
+		alpha = -WIN - 1
+		best_move = moves[0]
+		for cell in moves:
+			cells[cell] = piece
+			try:
+				if self._wins_at(cells, cell):
+					score = WIN - 1
+				else:
+					score = -self._negamax(cells, _other(piece), depth - 1, -WIN - 1, -alpha, 2)
+			finally:
+				cells[cell] = EMPTY
+			if score > alpha:
+				alpha = score
+				best_move = cell
+		return alpha, best_move
+
+	def _negamax(self, cells, piece, depth, alpha, beta, ply):
+		"""
+		Returns the score of the cells for the player to move, `piece`,
+		searching `depth` more moves. The last move never won, since
+		wins are detected as they are played.
+		"""
+		self._nodes += 1
+		if self._nodes & 63 == 0 and time.perf_counter() > self._deadline:
+			raise Timeout
+		moves = self._moves(cells)
+		if not moves:
+			return 0
+		if depth == 0:
+			return self._evaluate(cells, piece)
+		best = -WIN - 1
+		for cell in moves:
+			cells[cell] = piece
+			if self._wins_at(cells, cell):
+				score = WIN - ply
+			else:
+				score = -self._negamax(cells, _other(piece), depth - 1, -beta, -alpha, ply + 1)
+			cells[cell] = EMPTY
+			if score > best:
+				best = score
+			if best > alpha:
+				alpha = best
+			if alpha >= beta:
+				break
+		return best
+
+	def _moves(self, cells):
+		"""
+		Returns the empty cells worth searching: all of them on small
+		boards, only those next to a piece on large ones.
+		"""
+		empty = [cell for cell, piece in enumerate(cells) if piece == EMPTY]
+		if len(cells) <= 16:
+			return empty
+		if len(empty) == len(cells):
+			return [(self.rows // 2) * self.cols + self.cols // 2]
+		return [cell for cell in empty
+				if any(cells[other] != EMPTY for other in self.neighbors[cell])]
+
+	def _wins_at(self, cells, cell):
+		piece = cells[cell]
+		row, col = divmod(cell, self.cols)
+		for dr, dc in DIRECTIONS:
+			count = 1
+			for sign in (1, -1):
+				r = row + sign * dr
+				c = col + sign * dc
+				while (0 <= r < self.rows and 0 <= c < self.cols
+					   and cells[r * self.cols + c] == piece):
+					count += 1
+					r += sign * dr
+					c += sign * dc
+			if count >= self.k:
+				return True
+		return False
+
+	def _evaluate(self, cells, piece):
+		"""
+		Scores a position for `piece` by its open windows: every run of
+		k cells holding only one player's pieces counts more the fuller it is.
+		"""
+		score = 0
+		for window in self.windows:
+			mine = 0
+			theirs = 0
+			for cell in window:
+				if cells[cell] == piece:
+					mine += 1
+				elif cells[cell] != EMPTY:
+					theirs += 1
+			if theirs == 0:
+				score += 10 ** mine - 1
+			elif mine == 0:
+				score -= 10 ** theirs - 1
+		return score
+
+
+def _other(piece):
+	return O if piece == X else X
+
+
+def main():
+	import sys
+
+	rows, cols, k = (int(arg) for arg in sys.argv[1:4]) if len(sys.argv) >= 4 else (15, 15, 5)
+	budget = float(sys.argv[4]) if len(sys.argv) >= 5 else 1.0
+	game = Game(rows, cols, k)
+	board = game.initial_state()
+	while not game.terminal(board):
+		piece = game.player(board)
+		start = time.perf_counter()
+		move, depth = game.search(board, budget)
+		board = game.result(board, move)
+		print(f"{piece} plays {move} "
+			  f"(depth {depth}, {time.perf_counter() - start:.2f}s)")
+	for row in board:
+		print(" ".join(cell or "." for cell in row))
+	winner = game.winner(board)
+	print(f"Game Over: {winner} wins." if winner else "Game Over: Tie.")
+
+
+if __name__ == "__main__":
+	main()
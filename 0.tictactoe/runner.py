@@ -2,10 +2,17 @@
 
 import pygame
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+import book
 import tictactoe as ttt
 
+start = time.perf_counter()
+ttt.book = book.load()
+print(f"Opening book loaded in {(time.perf_counter() - start) * 1000:.3f}ms.")
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -21,12 +28,23 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# The AI searches in a background thread so the window keeps rendering,
+# and stops early once its cancel event is set
+FPS = 30
+clock = pygame.time.Clock()
+executor = ThreadPoolExecutor(max_workers=1)
+ai_future = None
+ai_started = None
+ai_cancel = None
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            if ai_cancel is not None:
+                ai_cancel.set()
+            executor.shutdown(wait=False, cancel_futures=True)
             sys.exit()
 
     screen.fill(black)
@@ -103,6 +121,8 @@ while True:
                 title = f"Game Over: {winner} wins."
         elif user == player:
             title = f"Play as {user}"
+        elif ai_started is not None:
+            title = f"Computer thinking... {time.perf_counter() - ai_started:.1f}s"
         else:
             title = f"Computer thinking..."
         title = largeFont.render(title, True, white)
@@ -110,15 +130,17 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, showing it for at least half a second
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_future is None:
+                ai_started = time.perf_counter()
+                ai_cancel = threading.Event()
+                ai_future = executor.submit(ttt.minimax, board, ai_cancel)
+            elif ai_future.done() and time.perf_counter() - ai_started >= 0.5:
+                board = ttt.result(board, ai_future.result())
+                ai_future = None
+                ai_started = None
+                ai_cancel = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -143,6 +165,6 @@ while True:
                     time.sleep(0.2)
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
 
     pygame.display.flip()
+    clock.tick(FPS)
@@ -0,0 +1,135 @@
+"""
+Headless Tic Tac Toe self-play benchmark
+
+Plays many games between engines across a process pool and reports
+win/draw/loss rates, moves per second and minimax call latencies.
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import book
+import tictactoe as ttt
+
+
+def random_engine(board, rng):
+	return rng.choice(ttt.actions(board))
+
+
+def minimax_engine(board, rng):
+	return ttt.minimax(board)
+
+
+def bitboard_engine(board, rng):
+	return bitboard.minimax(bitboard.from_lists(board))
+
+
+# Loaded once per process by play, before any move is timed
+_book = None
+
+
+def book_engine(board, rng):
+	return _book.move(board)
+
+
+ENGINES = {
+	"random": random_engine,
+	"minimax": minimax_engine,
+	"bitboard": bitboard_engine,
+	"book": book_engine,
+}
+
+
+def play(x_engine, o_engine, seed):
+	"""
+	Plays one game, returning (utility, latencies) with the seconds
+	taken by each move of a non-random engine.
+	"""
+	global _book
+	if _book is None and "book" in (x_engine, o_engine):
+		_book = book.load()
+	rng = random.Random(seed)
+	engines = {ttt.X: ENGINES[x_engine], ttt.O: ENGINES[o_engine]}
+	names = {ttt.X: x_engine, ttt.O: o_engine}
+	board = ttt.initial_state()
+	latencies = []
+	while not ttt.terminal(board):
+		current = ttt.player(board)
+		start = time.perf_counter()
+		move = engines[current](board, rng)
+		elapsed = time.perf_counter() - start
+		if names[current] != "random":
+			latencies.append(elapsed)
+		board = ttt.result(board, move)
+	return ttt.utility(board), latencies
+
+
+def _play(game):
+	return play(*game)
+
+
+def match(engine, opponent, games, workers, seed):
+	"""
+	Plays `games` games of engine against opponent, alternating who plays X,
+	and returns (wins, draws, losses, latencies, seconds) for the engine.
+	When an engine plays itself, the results are from X's point of view.
+	"""
+	schedule = []
+	for i in range(games):
+		if i % 2 == 0:
+			schedule.append((engine, opponent, seed + i))
+		else:
+			schedule.append((opponent, engine, seed + i))
+	wins = draws = losses = 0
+	latencies = []
+	start = time.perf_counter()
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		outcomes = executor.map(_play, schedule, chunksize=max(1, games // (4 * workers)))
+		for (x_engine, _, _), (utility, game_latencies) in zip(schedule, outcomes):
+			if x_engine != engine:
+				utility = -utility
+			if utility > 0:
+				wins += 1
+			elif utility < 0:
+				losses += 1
+			else:
+				draws += 1
+			latencies += game_latencies
+	return wins, draws, losses, latencies, time.perf_counter() - start
+
+
+def percentile(values, p):
+	return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark Tic Tac Toe engines.")
+	parser.add_argument("--engine", choices=sorted(ENGINES), default="minimax")
+	parser.add_argument("--games", type=int, default=1000,
+						help="number of games per matchup")
+	parser.add_argument("--workers", type=int, default=os.cpu_count())
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+
+	opponents = [args.engine]
+	if args.engine != "random":
+		opponents.append("random")
+	for opponent in opponents:
+		wins, draws, losses, latencies, seconds = match(
+			args.engine, opponent, args.games, args.workers, args.seed)
+		games = wins + draws + losses
+		print(f"{args.engine} vs {opponent}: {games} games in {seconds:.2f}s, "
+			  f"win {wins / games:.1%} draw {draws / games:.1%} loss {losses / games:.1%}")
+		if latencies:
+			latencies.sort()
+			print(f"    {len(latencies) / sum(latencies):,.0f} moves/s per worker, "
+				  f"minimax p50 {percentile(latencies, 0.50) * 1e6:.1f}us "
+				  f"p99 {percentile(latencies, 0.99) * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+	main()
@@ -3,11 +3,49 @@ Tic Tac Toe Player
 """
 
 import math
+import time
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Transposition table entry flags: the stored value is exact,
+# a lower bound or an upper bound on the minimax value
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Maps canonical board encodings to (value, flag) pairs
+table = {}
+
+# Number of positions visited by alphabeta, reset by report
+nodes = 0
+
+# Opening book from book.load(), used by minimax instead of searching
+book = None
+
+
+def _symmetry(transform):
+	"""
+	Returns the permutation of cell numbers 3 * i + j made by
+	a transform of (i, j) coordinates.
+	"""
+	return [3 * transform(i, j)[0] + transform(i, j)[1]
+			for i in range(3) for j in range(3)]
+
+
+# The 8 rotations and reflections of the board, identity first
+SYMMETRIES = [_symmetry(transform) for transform in [
+	lambda i, j: (i, j),
+	lambda i, j: (j, 2 - i),
+	lambda i, j: (2 - i, 2 - j),
+	lambda i, j: (2 - j, i),
+	lambda i, j: (i, 2 - j),
+	lambda i, j: (2 - i, j),
+	lambda i, j: (j, i),
+	lambda i, j: (2 - j, 2 - i),
+]]
+
 
 def initial_state():
 	"""
@@ -130,60 +168,129 @@ def utility(board):
 	return 0
 
 
-def minimax(board):
+def minimax(board, cancel=None):
 	"""
-	Returns the optimal action for the current player on the board.
+	Returns the optimal action for the current player on the board,
+	or None if the board is terminal or the optional threading.Event
+	`cancel` is set during the search.
 	"""
 	if terminal(board) == True:
 		return None
-	current_player = player(board)
-	moves = actions(board)
-	i = 0
-	move_len = len(moves)
-	save_other_win = EMPTY
-	middle = EMPTY
-	# check if any of the moves can make any of the players win
-	while i < move_len:
-		# checks if current player can win
-		if moves[i][0] == 1 and moves[i][1] == 1:
-			middle = moves[i]
-		temp_board = result(board, moves[i])
-		current_player_win = winner(temp_board)
-		if current_player_win == current_player:
-			return moves[i]
+	if book is not None:
+		move = book.move(board)
+		if move is not None:
+			return move
+	maximize = player(board) == X
+	best_move = None
+	best_value = None
+	for action in actions(board):
+		if cancel is not None and cancel.is_set():
+			return None
+		value = alphabeta(result(board, action), -2, 2)
+		if best_value is None or (value > best_value if maximize else value < best_value):
+			best_move = action
+			best_value = value
+	return best_move
+
+
+def alphabeta(board, alpha, beta):
+	"""
+	Returns the minimax value of the board within the (alpha, beta) window,
+	storing every result in the transposition table.
+	"""
+	global nodes
+	nodes += 1
+	if terminal(board):
+		return utility(board)
+	key = canonical(board)
+	if key in table:
+		value, flag = table[key]
+		if flag == EXACT:
+			return value
+		elif flag == LOWER:
+			alpha = max(alpha, value)
 		else:
-			# checks if the other player can win
-			k = 0
-			new_board = list(map(list, board))
-			while k < 3:
-				j = 0
-				while j < 3:
-					if moves[i][0] == k and moves[i][1] == j:
-						if current_player == X:
-							new_board[k][j] = O
-						else:
-							new_board[k][j] = X
-					j += 1
-				k += 1
-			other_player_win = winner(new_board)
-			if other_player_win != EMPTY:
-				save_other_win = moves[i]
-		i += 1
-	if save_other_win != EMPTY:
-		return save_other_win
-	# it will try to pick a free corner space to put its piece
-	# if it's not the first piece it will choose the middle if it's free
-	i = 0
-	while i < move_len:
-		if move_len < 8 and middle != EMPTY:
-			return middle
-		elif moves[i][0] == 0 and moves[i][1] == 0:
-			return moves[i]
-		elif moves[i][0] == 0 and moves[i][1] == 2:
-			return moves[i]
-		elif moves[i][0] == 2 and moves[i][1] == 0:
-			return moves[i]
-		elif moves[i][0] == 2 and moves[i][1] == 2:
-			return moves[i]
-		i += 1
-	return moves[0]
+			beta = min(beta, value)
+		if alpha >= beta:
+			return value
+	original_alpha = alpha
+	original_beta = beta
+	if player(board) == X:
+		value = -2
+		for action in actions(board):
+			value = max(value, alphabeta(result(board, action), alpha, beta))
+			alpha = max(alpha, value)
+			if alpha >= beta:
+				break
+	else:
+		value = 2
+		for action in actions(board):
+			value = min(value, alphabeta(result(board, action), alpha, beta))
+			beta = min(beta, value)
+			if alpha >= beta:
+				break
+	# a value outside the original window only bounds the true value
+	if value <= original_alpha:
+		table[key] = (value, UPPER)
+	elif value >= original_beta:
+		table[key] = (value, LOWER)
+	else:
+		table[key] = (value, EXACT)
+	return value
+
+
+def encode(board):
+	"""
+	Returns the board as an int with bit 3 * i + j set for an X at (i, j)
+	and bit 9 + 3 * i + j set for an O.
+	"""
+	code = 0
+	for i in range(3):
+		for j in range(3):
+			if board[i][j] == X:
+				code |= 1 << (3 * i + j)
+			elif board[i][j] == O:
+				code |= 1 << (9 + 3 * i + j)
+	return code
+
+
+def canonical(board):
+	"""
+	Returns the smallest encoding of the board under its 8 rotations and
+	reflections, so that equivalent positions share one table entry.
+	"""
+	code = encode(board)
+	best = code
+	for symmetry in SYMMETRIES[1:]:
+		moved = 0
+		for cell in range(9):
+			if code >> cell & 1:
+				moved |= 1 << symmetry[cell]
+			if code >> (9 + cell) & 1:
+				moved |= 1 << (9 + symmetry[cell])
+		best = min(best, moved)
+	return best
+
+
+def report(board):
+	"""
+	Returns (move, nodes searched, seconds taken) for a minimax call.
+	"""
+	global nodes
+	nodes = 0
+	start = time.perf_counter()
+	move = minimax(board)
+	return move, nodes, time.perf_counter() - start
+
+
+def main():
+	board = initial_state()
+	move, searched, seconds = report(board)
+	print(f"cold: {move} after {searched} nodes in {seconds * 1000:.3f}ms, "
+		  f"{len(table)} table entries")
+	move, searched, seconds = report(board)
+	print(f"warm: {move} after {searched} nodes in {seconds * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+import argparse
+import functools
+import random
+import time
+
+from logic import *
+
+CHECKERS = {
+    "recursive": model_check_recursive,
+    "compiled": model_check,
+    "vectorized": model_check_vectorized,
+    "sat": model_check_sat,
+}
+
+# Backends enumerating the truth table are never run on more symbols
+TABLES = {"recursive", "compiled", "vectorized"}
+
+
+def random_knowledge(count, clauses, rng):
+    """
+    Returns a knowledge base of random 3-literal clauses over `count`
+    symbols, and a query it entails: the disjunction of its first clause,
+    so every checker has to go through the whole truth table.
+    """
+    symbols = [Symbol(f"P{i}") for i in range(count)]
+    knowledge = And()
+    for _ in range(clauses):
+        literals = [symbol if rng.random() < 0.5 else Not(symbol)
+                    for symbol in rng.sample(symbols, min(3, count))]
+        knowledge.add(Or(*literals))
+    return knowledge, Or(*knowledge.conjuncts[0].disjuncts)
+
+
+def random_puzzle(people, statements, rng):
+    """
+    Returns a knights and knaves knowledge base in the style of puzzle.py
+    where each of `people` characters makes `statements` random claims
+    about the others, consistent with a hidden assignment of kinds, along
+    with the knight symbols and whether each character really is a knight.
+    """
+    knights = [Symbol(f"{i} is a Knight") for i in range(people)]
+    knaves = [Symbol(f"{i} is a Knave") for i in range(people)]
+    hidden = [rng.random() < 0.5 for _ in range(people)]
+    knowledge = And()
+    for i in range(people):
+        knowledge.add(Or(knights[i], knaves[i]))
+        knowledge.add(Not(And(knights[i], knaves[i])))
+        for _ in range(statements):
+            j, k = rng.sample(range(people), 2)
+            claim, truth = rng.choice([
+                (knights[j], hidden[j]),
+                (knaves[j], not hidden[j]),
+                (Biconditional(knights[j], knights[k]), hidden[j] == hidden[k]),
+                (And(knaves[j], knaves[k]), not hidden[j] and not hidden[k]),
+                (Or(knights[j], knights[k]), hidden[j] or hidden[k]),
+            ])
+            if truth != hidden[i]:
+                claim = Not(claim)
+            knowledge.add(Implication(knights[i], claim))
+            knowledge.add(Implication(knaves[i], Not(claim)))
+    return knowledge, knights, hidden
+
+
+def puzzle_benchmark(people, statements, queries, seed):
+    """
+    Times building a generated puzzle and the bookkeeping every backend
+    does on it before solving: collecting symbols, hashing and CNF
+    conversion, then a few SAT entailment checks, each from scratch and
+    against one incremental KnowledgeBase, and counting its models.
+    """
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    knowledge, knights, hidden = random_puzzle(people, statements, rng)
+    timings = [("build", time.perf_counter() - start)]
+
+    steps = [
+        ("symbols", lambda: knowledge.symbols()),
+        ("hash", lambda: hash(knowledge)),
+        ("to_cnf", lambda: to_cnf(knowledge)),
+    ]
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        timings.append((name, time.perf_counter() - start))
+
+    asked = rng.sample(range(people), min(queries, people))
+    start = time.perf_counter()
+    for i in asked:
+        query = knights[i] if hidden[i] else Not(knights[i])
+        if not model_check_sat(knowledge, query):
+            raise SystemExit("sat failed to prove an entailed query")
+    timings.append((f"{len(asked)} sat", time.perf_counter() - start))
+
+    # The same queries against one incremental knowledge base
+    start = time.perf_counter()
+    kb = KnowledgeBase(knowledge)
+    timings.append(("kb add", time.perf_counter() - start))
+    start = time.perf_counter()
+    for i in asked:
+        query = knights[i] if hidden[i] else Not(knights[i])
+        if not kb.ask(query):
+            raise SystemExit("knowledge base failed to prove an entailed query")
+    timings.append((f"{len(asked)} asks", time.perf_counter() - start))
+
+    start = time.perf_counter()
+    models = count_models(knowledge)
+    timings.append(("count", time.perf_counter() - start))
+
+    print(f"{people} people, {len(knowledge.conjuncts)} clauses, {models} models")
+    for name, elapsed in timings:
+        print(f"{name:>10}: {elapsed:8.4f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare model checking backends on random knowledge bases.")
+    parser.add_argument("--symbols", type=int, nargs="+",
+                        default=[6, 8, 10, 12, 14, 16, 18, 20, 22, 24,
+                                 100, 200, 500],
+                        help="symbol counts to measure")
+    parser.add_argument("--ratio", type=float, default=2.0,
+                        help="clauses per symbol")
+    parser.add_argument("--limit", type=float, default=10.0,
+                        help="stop timing a backend once a check takes this many seconds")
+    parser.add_argument("--max-table", type=int, default=24,
+                        help="largest symbol count for truth table backends")
+    parser.add_argument("--processes", type=int,
+                        help="also time model_check split across this many processes")
+    parser.add_argument("--puzzle", type=int, metavar="PEOPLE",
+                        help="time a generated knights and knaves puzzle instead")
+    parser.add_argument("--statements", type=int, default=4,
+                        help="claims made by each person in a generated puzzle")
+    parser.add_argument("--queries", type=int, default=10,
+                        help="people to ask about in a generated puzzle")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.puzzle:
+        puzzle_benchmark(args.puzzle, args.statements, args.queries, args.seed)
+        return
+
+    checkers = dict(CHECKERS)
+    tables = set(TABLES)
+    if args.processes:
+        checkers["parallel"] = functools.partial(model_check, processes=args.processes)
+        tables.add("parallel")
+
+    rng = random.Random(args.seed)
+    skipped = set()
+    print(f"{'symbols':>7}" + "".join(f"{name:>12}" for name in checkers))
+    for count in args.symbols:
+        knowledge, query = random_knowledge(count, int(args.ratio * count), rng)
+        row = f"{count:>7}"
+        for name, check in checkers.items():
+            if name in skipped or (name in tables and count > args.max_table):
+                row += f"{'-':>12}"
+                continue
+            start = time.perf_counter()
+            if not check(knowledge, query):
+                raise SystemExit(f"{name} failed to prove an entailed query")
+            elapsed = time.perf_counter() - start
+            if elapsed > args.limit:
+                skipped.add(name)
+            row += f"{elapsed:11.4f}s"
+        print(row, flush=True)
+
+
+if __name__ == "__main__":
+    main()
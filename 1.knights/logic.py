@@ -1,7 +1,45 @@
+import collections
+import functools
+import heapq
+import inspect
 import itertools
+import multiprocessing
+import weakref
+
+
+class Interned(type):
+    """
+    Metaclass for immutable sentences that hash-conses their instances:
+    constructing a sentence equal to one that already exists returns the
+    existing object, so repeated subsentences are shared and compare by
+    identity, and their hashes and symbols are only ever computed once.
+    The table holds its sentences weakly, so a sentence is dropped from it
+    once nothing else refers to it.
+    """
+
+    def __init__(cls, *args):
+        super().__init__(*args)
+        cls.instances = weakref.WeakValueDictionary()
+        cls.signature = inspect.signature(cls.__init__)
+
+    def __call__(cls, *args, **kwargs):
+        if kwargs:
+            # Keyword arguments share the key of the positional call
+            bound = cls.signature.bind(None, *args, **kwargs)
+            bound.apply_defaults()
+            args = bound.args[1:]
+        sentence = cls.instances.get(args)
+        if sentence is None:
+            # Operands that could still change are kept as frozen copies
+            args = tuple(arg.freeze() if isinstance(arg, Sentence) else arg
+                         for arg in args)
+            sentence = super().__call__(*args)
+            cls.instances[args] = sentence
+        return sentence
 
 
 class Sentence():
+    _symbols = frozenset()
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -11,6 +49,22 @@ class Sentence():
         """Returns string formula representing logical sentence."""
         return ""
 
+    def expression(self, index):
+        """Returns Python source evaluating the sentence over a tuple `v`
+        of truth values, where index maps symbol names to positions."""
+        raise Exception("nothing to compile")
+
+    def bitwise(self, columns, full):
+        """Evaluates the sentence in many models at once. columns maps each
+        symbol name to an int whose bit m is its value in model m, and
+        full has a bit set for every model."""
+        raise Exception("nothing to evaluate")
+
+    def tseitin(self, cnf):
+        """Adds clauses defining a literal equivalent to the sentence
+        to a CNF and returns that literal."""
+        raise Exception("nothing to encode")
+
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
         return set()
@@ -20,6 +74,10 @@ class Sentence():
         if not isinstance(sentence, Sentence):
             raise TypeError("must be a logical sentence")
 
+    def freeze(self):
+        """Returns an immutable sentence equal to this one."""
+        return self
+
     @classmethod
     def parenthesize(cls, s):
         """Parenthesizes an expression if not already parenthesized."""
@@ -42,16 +100,22 @@ class Sentence():
             return f"({s})"
 
 
-class Symbol(Sentence):
+class Symbol(Sentence, metaclass=Interned):
 
     def __init__(self, name):
         self.name = name
+        self._hash = hash(("symbol", name))
+        self._symbols = frozenset([name])
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name)
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        return self._hash
+
+    def __reduce__(self):
+        return Symbol, (self.name,)
 
     def __repr__(self):
         return self.name
@@ -65,20 +129,36 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
+    def expression(self, index):
+        return f"v[{index[self.name]}]"
+
+    def bitwise(self, columns, full):
+        return columns[self.name]
+
+    def tseitin(self, cnf):
+        return cnf.variable(self.name)
+
     def symbols(self):
-        return {self.name}
+        return set(self._symbols)
 
 
-class Not(Sentence):
+class Not(Sentence, metaclass=Interned):
     def __init__(self, operand):
         Sentence.validate(operand)
         self.operand = operand
+        self._hash = hash(("not", hash(operand)))
+        self._symbols = frozenset(operand._symbols)
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and self._hash == other._hash
+            and self.operand == other.operand)
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        return self._hash
+
+    def __reduce__(self):
+        return Not, (self.operand,)
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +169,49 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
+    def expression(self, index):
+        return f"(not {self.operand.expression(index)})"
+
+    def bitwise(self, columns, full):
+        return full ^ self.operand.bitwise(columns, full)
+
+    def tseitin(self, cnf):
+        return -cnf.literal(self.operand)
+
     def symbols(self):
-        return self.operand.symbols()
+        return set(self._symbols)
 
 
 class And(Sentence):
+    """
+    Conjunction, the one sentence that can grow with add() and so is never
+    interned. Its symbols are collected as conjuncts are added and its hash
+    is cached until the next add(). An And that becomes part of another
+    sentence is replaced there by a FrozenAnd of its current conjuncts.
+    """
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
+        self.conjuncts = [conjunct.freeze() for conjunct in conjuncts]
+        self._hash = None
+        self._symbols = set().union(
+            *[conjunct._symbols for conjunct in conjuncts])
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And) and hash(self) == hash(other)
+            and list(self.conjuncts) == list(other.conjuncts))
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        if self._hash is None:
+            self._hash = hash(
+                ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+            )
+        return self._hash
+
+    def __reduce__(self):
+        return And, tuple(self.conjuncts)
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -115,7 +221,12 @@ class And(Sentence):
 
     def add(self, conjunct):
         Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        self.conjuncts.append(conjunct.freeze())
+        self._hash = None
+        self._symbols |= conjunct._symbols
+
+    def freeze(self):
+        return FrozenAnd(*self.conjuncts)
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +237,80 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(conjunct.expression(index)
+                                  for conjunct in self.conjuncts) + ")"
+
+    def bitwise(self, columns, full):
+        result = full
+        for conjunct in self.conjuncts:
+            result &= conjunct.bitwise(columns, full)
+        return result
+
+    def tseitin(self, cnf):
+        if not self.conjuncts:
+            return cnf.true()
+        literals = [cnf.literal(conjunct) for conjunct in self.conjuncts]
+        v = cnf.fresh()
+        for literal in literals:
+            cnf.clauses.append([-v, literal])
+        cnf.clauses.append([v] + [-literal for literal in literals])
+        return v
+
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return set(self._symbols)
+
+
+class FrozenAnd(And, metaclass=Interned):
+    """
+    Conjunction that can no longer grow, interned like the other
+    sentences and used in place of an And inside other sentences.
+    """
+
+    def __init__(self, *conjuncts):
+        super().__init__(*conjuncts)
+        self.conjuncts = tuple(self.conjuncts)
+        self._hash = hash(
+            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+        )
+        self._symbols = frozenset(self._symbols)
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return FrozenAnd, self.conjuncts
+
+    def add(self, conjunct):
+        raise TypeError("cannot add to a conjunction inside another sentence")
 
+    def freeze(self):
+        return self
 
-class Or(Sentence):
+
+class Or(Sentence, metaclass=Interned):
     def __init__(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        self.disjuncts = disjuncts
+        self._hash = hash(
+            ("or", tuple(hash(disjunct) for disjunct in disjuncts))
+        )
+        self._symbols = frozenset().union(
+            *[disjunct._symbols for disjunct in disjuncts])
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or) and self._hash == other._hash
+            and self.disjuncts == other.disjuncts)
 
     def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        return self._hash
+
+    def __reduce__(self):
+        return Or, self.disjuncts
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +325,52 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(disjunct.expression(index)
+                                 for disjunct in self.disjuncts) + ")"
+
+    def bitwise(self, columns, full):
+        result = 0
+        for disjunct in self.disjuncts:
+            result |= disjunct.bitwise(columns, full)
+        return result
+
+    def tseitin(self, cnf):
+        if not self.disjuncts:
+            return -cnf.true()
+        literals = [cnf.literal(disjunct) for disjunct in self.disjuncts]
+        v = cnf.fresh()
+        for literal in literals:
+            cnf.clauses.append([v, -literal])
+        cnf.clauses.append([-v] + literals)
+        return v
+
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        return set(self._symbols)
 
 
-class Implication(Sentence):
+class Implication(Sentence, metaclass=Interned):
     def __init__(self, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
         self.consequent = consequent
+        self._hash = hash(("implies", hash(antecedent), hash(consequent)))
+        self._symbols = frozenset(antecedent._symbols | consequent._symbols)
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication) and self._hash == other._hash
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        return self._hash
+
+    def __reduce__(self):
+        return Implication, (self.antecedent, self.consequent)
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,24 +384,45 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
+    def expression(self, index):
+        return (f"(not {self.antecedent.expression(index)}"
+                f" or {self.consequent.expression(index)})")
+
+    def bitwise(self, columns, full):
+        return ((full ^ self.antecedent.bitwise(columns, full))
+                | self.consequent.bitwise(columns, full))
+
+    def tseitin(self, cnf):
+        a = cnf.literal(self.antecedent)
+        b = cnf.literal(self.consequent)
+        v = cnf.fresh()
+        cnf.clauses += [[-v, -a, b], [v, a], [v, -b]]
+        return v
+
     def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+        return set(self._symbols)
 
 
-class Biconditional(Sentence):
+class Biconditional(Sentence, metaclass=Interned):
     def __init__(self, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
         self.right = right
+        self._hash = hash(("biconditional", hash(left), hash(right)))
+        self._symbols = frozenset(left._symbols | right._symbols)
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional) and self._hash == other._hash
+            and self.left == other.left
+            and self.right == other.right)
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        return self._hash
+
+    def __reduce__(self):
+        return Biconditional, (self.left, self.right)
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -221,12 +438,705 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
+    def expression(self, index):
+        return (f"({self.left.expression(index)}"
+                f" == {self.right.expression(index)})")
+
+    def bitwise(self, columns, full):
+        return full ^ (self.left.bitwise(columns, full)
+                       ^ self.right.bitwise(columns, full))
+
+    def tseitin(self, cnf):
+        a = cnf.literal(self.left)
+        b = cnf.literal(self.right)
+        v = cnf.fresh()
+        cnf.clauses += [[-v, -a, b], [-v, a, -b], [v, a, b], [v, -a, -b]]
+        return v
+
     def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+        return set(self._symbols)
+
+
+def compile_sentence(sentence, symbols):
+    """Compiles a sentence into a function of a tuple of truth values,
+    one for each symbol name in the order given."""
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    return _compile_expression(sentence.expression(index))
+
 
+@functools.lru_cache(maxsize=1024)
+def _compile_expression(source):
+    """Compiles expression source, reusing the code for repeated sentences."""
+    return eval(f"lambda v: {source}")
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+
+def model_check(knowledge, query, processes=None, split=None):
+    """Checks if knowledge base entails query. Given a number of processes,
+    the truth table is split on the first `split` symbols and the parts
+    are checked in parallel by a process pool."""
+
+    # Get all symbols in both knowledge and query
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    if processes:
+        return model_check_parallel(knowledge, query, symbols, processes, split)
+
+    # Entailment holds if the query is true in every model of the knowledge
+    try:
+        compiled_knowledge = compile_sentence(knowledge, symbols)
+        compiled_query = compile_sentence(query, symbols)
+    except (SyntaxError, RecursionError, MemoryError):
+        # The Python parser limits how deeply expressions can nest
+        return model_check_vectorized(knowledge, query)
+    knowledge, query = compiled_knowledge, compiled_query
+    models = itertools.product((True, False), repeat=len(symbols))
+    return all(map(query, filter(knowledge, models)))
+
+
+def truth_table(symbols, chunk_bits=16):
+    """Yields (columns, full) pairs covering every model of the symbols in
+    chunks of up to 2 ** chunk_bits models: columns maps each symbol to an
+    int whose bit m is the symbol's value in model m of the chunk."""
+    low = symbols[:chunk_bits]
+    high = symbols[chunk_bits:]
+    size = 1 << len(low)
+    full = (1 << size) - 1
+
+    # Symbol i is true in the upper half of every run of 2 ** (i + 1)
+    # models, so its column is that run doubled up to the chunk size
+    columns = {}
+    for i, symbol in enumerate(low):
+        width = 2 << i
+        column = ((1 << (width >> 1)) - 1) << (width >> 1)
+        while width < size:
+            column |= column << width
+            width <<= 1
+        columns[symbol] = column
+
+    # The remaining symbols are constant within a chunk
+    for chunk in range(1 << len(high)):
+        for j, symbol in enumerate(high):
+            columns[symbol] = full if chunk >> j & 1 else 0
+        yield columns, full
+
+
+def model_check_vectorized(knowledge, query, chunk_bits=16):
+    """Checks if knowledge base entails query by evaluating the sentences
+    as bitwise operations over whole truth table columns at once."""
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    for columns, full in truth_table(symbols, chunk_bits):
+        counter_models = (knowledge.bitwise(columns, full)
+                          & ~query.bitwise(columns, full))
+        if counter_models:
+            return False
+    return True
+
+
+def model_check_parallel(knowledge, query, symbols, processes, split=None):
+    """Checks if knowledge base entails query by fixing every assignment of
+    the first `split` symbols in turn and checking the rest of the truth
+    table for each of them in a process pool, stopping every worker as soon
+    as one of them finds a counter-model."""
+    if split is None:
+        # Several parts per process even out parts that finish early
+        split = (4 * processes - 1).bit_length()
+    split = min(split, len(symbols))
+    found = multiprocessing.Event()
+    initargs = (knowledge, query, symbols[:split], symbols[split:], found)
+    with multiprocessing.Pool(processes, _initialize_part, initargs) as pool:
+        for entailed in pool.imap_unordered(_check_part, range(1 << split)):
+            if not entailed:
+                found.set()
+                return False
+    return True
+
+
+# Arguments of model_check_parallel inside a worker process
+_part = None
+
+
+def _initialize_part(*args):
+    global _part
+    _part = args
+
+
+def _check_part(part):
+    """Checks the models where fixed symbol j has the value of bit j of
+    part, giving up between chunks once another worker has found a
+    counter-model."""
+    knowledge, query, fixed, symbols, found = _part
+    for columns, full in truth_table(symbols):
+        if found.is_set():
+            return True
+        for j, symbol in enumerate(fixed):
+            columns[symbol] = full if part >> j & 1 else 0
+        if knowledge.bitwise(columns, full) & ~query.bitwise(columns, full):
+            return False
+    return True
+
+
+def model_check_many(knowledge, queries, chunk_bits=16):
+    """Checks which of many queries the knowledge base entails, returning
+    a list of booleans. The truth table is enumerated once, and the models
+    of the knowledge base in each chunk are shared by every query."""
+    queries = list(queries)
+    symbols = sorted(set.union(knowledge.symbols(),
+                               *[query.symbols() for query in queries]))
+    entailed = [True] * len(queries)
+    for columns, full in truth_table(symbols, chunk_bits):
+        models = knowledge.bitwise(columns, full)
+        if not models:
+            continue
+        for i, query in enumerate(queries):
+            if entailed[i] and models & ~query.bitwise(columns, full):
+                entailed[i] = False
+        if not any(entailed):
+            break
+    return entailed
+
+
+class CNF():
+    """
+    Clauses equivalent to a set of sentences, over integer literals:
+    variable n is true for the literal n and false for the literal -n.
+
+    Every symbol gets a variable, and every compound subsentence gets a
+    fresh variable defined to be equivalent to it (the Tseitin encoding),
+    so the clauses stay linear in the size of the sentences and have
+    exactly one model for each model of the sentences.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = {}
+        self.definitions = {}
+        self.count = 0
+        self.constant = None
+
+    def fresh(self):
+        """Returns a new variable."""
+        self.count += 1
+        return self.count
+
+    def variable(self, name):
+        """Returns the variable of a symbol name."""
+        if name not in self.variables:
+            self.variables[name] = self.fresh()
+        return self.variables[name]
+
+    def true(self):
+        """Returns a literal that is true in every model."""
+        if self.constant is None:
+            self.constant = self.fresh()
+            self.clauses.append([self.constant])
+        return self.constant
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to a sentence, defining it on first use."""
+        if sentence not in self.definitions:
+            self.definitions[sentence] = sentence.tseitin(self)
+        return self.definitions[sentence]
+
+    def add(self, sentence):
+        """Adds clauses asserting that a sentence is true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(disjunct)
+                                 for disjunct in sentence.disjuncts])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+
+def to_cnf(sentence):
+    """Converts a sentence to conjunctive normal form."""
+    cnf = CNF()
+    cnf.add(sentence)
+    return cnf
+
+
+class Solver():
+    """
+    Conflict-driven clause learning SAT solver over integer literals.
+
+    Propagates units by watching two literals of every clause, learns
+    the first unique implication point clause of every conflict and
+    backjumps, picks decisions by decaying conflict activity with saved
+    phases, and restarts after geometrically growing numbers of conflicts.
+    """
+
+    def __init__(self, clauses=()):
+        self.values = {}
+        self.levels = {}
+        self.reasons = {}
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.watches = collections.defaultdict(list)
+        self.clauses = []
+        self.learned = []
+        self.activity = collections.defaultdict(float)
+        self.increment = 1.0
+        self.phases = {}
+        self.heap = []
+        self.ok = True
+        self.model = None
+        self.conflicts = 0
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, literals):
+        """
+        Adds a clause, returning False if the clauses have become
+        unsatisfiable without any assumptions.
+        """
+        self._backtrack(0)
+        if not self.ok:
+            return False
+        clause = []
+        for literal in dict.fromkeys(literals):
+            if -literal in clause:
+                return True
+            self._declare(abs(literal))
+            value = self._value(literal)
+            if value is True:
+                return True
+            if value is None:
+                clause.append(literal)
+
+        # Literals false without any decisions can never help
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self._assign(clause[0], None)
+            self.ok = self._propagate() is None
+        else:
+            self.clauses.append(clause)
+            self._watch(clause)
+        return self.ok
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses are satisfiable with every assumed
+        literal true, storing a satisfying model as a dict from variables
+        to truth values in self.model, and False otherwise.
+        """
+        self.model = None
+        self._backtrack(0)
+        if not self.ok:
+            return False
+        for literal in assumptions:
+            self._declare(abs(literal))
+
+        restart = 100
+        conflicts = 0
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_limits:
+                    self.ok = False
+                    return False
+                learned, level = self._analyze(conflict)
+                self._backtrack(level)
+                if len(learned) > 1:
+                    self.learned.append(learned)
+                    self._watch(learned)
+                    self._assign(learned[0], learned)
+                else:
+                    self._assign(learned[0], None)
+                self.increment /= 0.95
+                continue
+
+            if conflicts >= restart:
+                self._backtrack(0)
+                conflicts = 0
+                restart = restart * 3 // 2
+                continue
+
+            # Assumptions are the first decisions, one per level
+            level = len(self.trail_limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self._value(literal)
+                if value is False:
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if value is None:
+                    self._assign(literal, None)
+                continue
+
+            variable = self._pick()
+            if variable is None:
+                self.model = dict(self.values)
+                return True
+            self.trail_limits.append(len(self.trail))
+            self._assign(variable if self.phases.get(variable) else -variable, None)
+
+    def _declare(self, variable):
+        if variable not in self.activity:
+            self.activity[variable] = 0.0
+            heapq.heappush(self.heap, (0.0, variable))
+
+    def _value(self, literal):
+        value = self.values.get(abs(literal))
+        if value is None:
+            return None
+        return value == (literal > 0)
+
+    def _assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = literal > 0
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def _watch(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def _propagate(self):
+        """
+        Assigns every literal implied by unit clauses, returning
+        a clause with every literal false or None.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches[false]
+            kept = []
+            for i, clause in enumerate(watching):
+                # Keep the false literal second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                if self._value(clause[0]) is True:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    if self._value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], false
+                        self.watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self._value(clause[0]) is False:
+                        kept += watching[i + 1:]
+                        self.watches[false] = kept
+                        return clause
+                    self._assign(clause[0], clause)
+            self.watches[false] = kept
+        return None
+
+    def _analyze(self, conflict):
+        """
+        Resolves the conflict clause with the reasons of the literals
+        assigned at the current level until one of them is left, returning
+        the learned clause, asserting literal first, and the level to
+        backjump to.
+        """
+        level = len(self.trail_limits)
+        learned = [None]
+        seen = set()
+        pending = 0
+        index = len(self.trail)
+        clause = conflict
+        while True:
+            for literal in clause:
+                variable = abs(literal)
+                if variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self._bump(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(literal)
+            index -= 1
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            pending -= 1
+            if not pending:
+                break
+            clause = self.reasons[abs(literal)]
+        learned[0] = -literal
+
+        if len(learned) == 1:
+            return learned, 0
+        # Watch the literal that becomes false last
+        deepest = max(range(1, len(learned)),
+                      key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def _bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            for other in self.activity:
+                self.activity[other] *= 1e-100
+            self.increment *= 1e-100
+            self.heap = [(-self.activity[other], other) for other in self.activity
+                         if other not in self.values]
+            heapq.heapify(self.heap)
+
+    def _pick(self):
+        """Returns the unassigned variable with the most activity, or None."""
+        while self.heap:
+            _, variable = heapq.heappop(self.heap)
+            if variable not in self.values:
+                return variable
+        return None
+
+    def _backtrack(self, level):
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phases[variable] = literal > 0
+            del self.values[variable]
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = start
+
+
+class KnowledgeBase():
+    """
+    Knowledge base that grows one sentence at a time and answers queries
+    incrementally with a single Solver.
+
+    Sentences are encoded once with a persistent CNF, and the solver keeps
+    its clauses and everything it has learned between queries. Queries and
+    assumptions are passed to the solver as assumed literals rather than
+    added as clauses, so asking never changes the knowledge base.
+    """
+
+    def __init__(self, *sentences):
+        self.sentences = []
+        self.cnf = CNF()
+        self.solver = Solver()
+        self.encoded = 0
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds a sentence known to be true."""
+        Sentence.validate(sentence)
+        self.sentences.append(sentence)
+        self.cnf.add(sentence)
+        self._update()
+
+    def ask(self, query, assumptions=()):
+        """Checks if the knowledge base entails query when every
+        sentence in assumptions is also true."""
+        literals = [self.cnf.literal(sentence) for sentence in assumptions]
+        literals.append(-self.cnf.literal(query))
+        self._update()
+        return not self.solver.solve(literals)
+
+    def _update(self):
+        """Passes clauses the CNF has gained since the last call to the
+        solver, which only ever adds to what it has learned."""
+        for clause in self.cnf.clauses[self.encoded:]:
+            self.solver.add_clause(clause)
+        self.encoded = len(self.cnf.clauses)
+
+
+class ModelCounter():
+    """
+    Exact model counter (#SAT) over clauses of integer literals.
+
+    Unit propagation settles every forced variable, the remaining clauses
+    are split into components that share no variables and are counted
+    independently, and each component branches on a central variable, so
+    that chains of clauses fall apart into halves instead of being peeled
+    one variable at a time. Component counts are cached by their set of
+    clauses, and every variable left out of the remaining clauses doubles
+    the count.
+    """
+
+    def __init__(self):
+        self.cache = {}
+
+    def count(self, clauses, variables, assumptions=()):
+        """Returns the number of assignments to variables 1 to `variables`
+        satisfying every clause and assumed literal."""
+        clauses = [frozenset(clause) for clause in clauses]
+        propagated = _propagate(clauses, assumptions)
+        if propagated is None:
+            return 0
+        clauses, assigned = propagated
+        free = variables - len(assigned) - len(_variables(clauses))
+        return self._count(clauses) << free
+
+    def _count(self, clauses):
+        """Counts the models of clauses over the variables they mention."""
+        result = 1
+        for component in _components(clauses):
+            result *= self._component(component)
+            if not result:
+                break
+        return result
+
+    def _component(self, clauses):
+        if clauses in self.cache:
+            return self.cache[clauses]
+        occurrences = collections.Counter(
+            abs(literal) for clause in clauses for literal in clause)
+        if not occurrences:
+            # Only empty clauses, which nothing satisfies
+            return 0
+        variable = _central(clauses, occurrences)
+        total = 0
+        for literal in (variable, -variable):
+            propagated = _propagate(clauses, [literal])
+            if propagated is None:
+                continue
+            remaining, assigned = propagated
+            free = len(occurrences) - len(assigned) - len(_variables(remaining))
+            total += self._count(remaining) << free
+        self.cache[clauses] = total
+        return total
+
+
+def _variables(clauses):
+    return {abs(literal) for clause in clauses for literal in clause}
+
+
+def _central(clauses, occurrences):
+    """
+    Returns a variable halfway along a longest shortest path between the
+    variables of connected clauses, preferring the most frequent one, by
+    two breadth-first searches over variables that share a clause.
+    """
+    by_variable = collections.defaultdict(list)
+    for clause in clauses:
+        for literal in clause:
+            by_variable[abs(literal)].append(clause)
+
+    def levels(start):
+        frontier = [start]
+        seen = {start}
+        result = []
+        while frontier:
+            result.append(frontier)
+            following = []
+            for variable in frontier:
+                for clause in by_variable[variable]:
+                    for literal in clause:
+                        neighbor = abs(literal)
+                        if neighbor not in seen:
+                            seen.add(neighbor)
+                            following.append(neighbor)
+            frontier = following
+        return result
+
+    start = max(occurrences, key=occurrences.get)
+    middle = levels(levels(start)[-1][0])
+    return max(middle[len(middle) // 2], key=occurrences.get)
+
+
+def _propagate(clauses, literals):
+    """
+    Assigns the literals and every literal unit clauses then force,
+    returning the frozenset of simplified clauses left unsatisfied and the
+    set of assigned variables, or None if some clause is or becomes false.
+    """
+    if not all(clauses):
+        return None
+    remaining = {clause: clause for clause in clauses}
+    occurrences = collections.defaultdict(list)
+    for clause in clauses:
+        for literal in clause:
+            occurrences[literal].append(clause)
+    pending = list(literals)
+    pending += [literal for clause in clauses if len(clause) == 1
+                for literal in clause]
+    assigned = set()
+    while pending:
+        literal = pending.pop()
+        if literal in assigned:
+            continue
+        if -literal in assigned:
+            return None
+        assigned.add(literal)
+        for clause in occurrences[literal]:
+            remaining.pop(clause, None)
+        for clause in occurrences[-literal]:
+            if clause not in remaining:
+                continue
+            rest = remaining[clause] - {-literal}
+            if not rest:
+                return None
+            remaining[clause] = rest
+            if len(rest) == 1:
+                pending += rest
+    return frozenset(remaining.values()), {abs(literal) for literal in assigned}
+
+
+def _components(clauses):
+    """Splits clauses into groups that share no variables."""
+    by_variable = collections.defaultdict(list)
+    for clause in clauses:
+        for literal in clause:
+            by_variable[abs(literal)].append(clause)
+    components = []
+    seen = set()
+    visited = set()
+    for clause in clauses:
+        if clause in seen:
+            continue
+        seen.add(clause)
+        component = []
+        stack = [clause]
+        while stack:
+            current = stack.pop()
+            component.append(current)
+            for literal in current:
+                variable = abs(literal)
+                if variable in visited:
+                    continue
+                visited.add(variable)
+                for other in by_variable[variable]:
+                    if other not in seen:
+                        seen.add(other)
+                        stack.append(other)
+        components.append(frozenset(component))
+    return components
+
+
+def count_models(knowledge):
+    """Returns the number of models of the knowledge base over its symbols."""
+    cnf = to_cnf(knowledge)
+    return ModelCounter().count(cnf.clauses, cnf.count)
+
+
+def probability(knowledge, query):
+    """Returns the fraction of the models of the knowledge base in which
+    the query is true, over the symbols of both."""
+    cnf = to_cnf(knowledge)
+    literal = cnf.literal(query)
+    counter = ModelCounter()
+    total = counter.count(cnf.clauses, cnf.count)
+    if not total:
+        raise Exception("knowledge base has no models")
+    return counter.count(cnf.clauses, cnf.count, [literal]) / total
+
+
+def model_check_sat(knowledge, query):
+    """Checks if knowledge base entails query by showing that the
+    knowledge base together with the negated query is unsatisfiable."""
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return not Solver(cnf.clauses).solve()
+
+
+def model_check_recursive(knowledge, query):
+    """Checks if knowledge base entails query by recursively
+    enumerating models as dicts and evaluating the sentence trees."""
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
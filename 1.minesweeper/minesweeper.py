@@ -157,14 +157,21 @@ class MinesweeperAI():
 		# List of sentences about the game known to be true
 		self.knowledge = []
 
+		# Positions in self.knowledge of the sentences containing each cell
+		self.index = {}
+
 	def mark_mine(self, cell):
 		"""
 		Marks a cell as a mine, and updates all knowledge
 		to mark that cell as a mine as well.
 		"""
 		self.mines.add(cell)
-		for sentence in self.knowledge:
+		positions = self.index.get(cell, set())
+		for position in list(positions):
+			sentence = self.knowledge[position]
 			sentence.mark_mine(cell)
+			if cell not in sentence.cells:
+				positions.discard(position)
 
 	def mark_safe(self, cell):
 		"""
@@ -172,8 +179,12 @@ class MinesweeperAI():
 		to mark that cell as safe as well.
 		"""
 		self.safes.add(cell)
-		for sentence in self.knowledge:
+		positions = self.index.get(cell, set())
+		for position in list(positions):
+			sentence = self.knowledge[position]
 			sentence.mark_safe(cell)
+			if cell not in sentence.cells:
+				positions.discard(position)
 
 	def add_knowledge(self, cell, count):
 		"""
@@ -209,15 +220,8 @@ class MinesweeperAI():
 		while i < i_stop:
 			j = j_start
 			while j < j_stop:
-				found = 1
 				# don't add to set if cell has already been marked as 'safe'
-				for elem in self.moves_made:
-					if elem == (i, j):
-						found = 0
-				for elem in self.safes:
-					if elem == (i, j):
-						found = 0
-				if found == 1:
+				if (i, j) not in self.moves_made and (i, j) not in self.safes:
 					temp.cells.add((i, j))
 				j += 1
 			i += 1
@@ -231,32 +235,21 @@ class MinesweeperAI():
 				self.mark_mine(elem)
 		else:
 			# if neither we will add the sentence to logic
+			for elem in temp.cells:
+				self.index.setdefault(elem, set()).add(len(self.knowledge))
 			self.knowledge.append(temp)
 		# loop through sentences in knowledge to see if we can add cells to either 'safe' or 'mine'
 		for sentence in self.knowledge:
 			# removes safe cells if we already have determed the remaining cells to be mines in the sentence
 			if len(sentence.cells) > sentence.count and sentence.count > 0:
-				temp = set()
-				for elem in sentence.cells:
-					for cell in self.mines:
-						if elem == cell:
-							temp.add(cell)
+				temp = sentence.cells & self.mines
 				if len(temp) > 0 and len(temp) == sentence.count:
-					i = 0
-					while i == 0:
-						for elem in sentence.cells:
-							found = 0
-							for cell in temp:
-								if elem == cell:
-									found = 1
-							if found == 0:
-								self.mark_safe(elem)
-								break
-						if found == 1:
-							break
+					for elem in sentence.cells - temp:
+						self.mark_safe(elem)
 			# makes sure cells that has a count equal to 0 is marked as 'safe'
+			# (cells already marked safe are only left in sentences like this one)
 			if len(sentence.cells) > 0 and sentence.count == 0:
-				for elem in sentence.cells:
+				for elem in sentence.cells - self.safes:
 					self.mark_safe(elem)
 			# makes sure cells that has a len count equal equal to count is marked as 'mines'
 			elif len(sentence.cells) == sentence.count and sentence.count > 0:
@@ -300,23 +293,13 @@ class MinesweeperAI():
 		for sentence in self.knowledge:
 			if sentence.count > 0 and len(sentence.cells) - sentence.count >= 3:
 				for elem in sentence.cells:
-					found = 0
-					for cell in self.mines:
-						found = 1
-					if found == 0:
+					if elem not in self.mines:
 						remain.add(elem)
 		# collect all cells on board that has not already been moved nor known to be mines
 		if len(remain) < 10:
 			for i in range(self.height):
 				for j in range(self.width):
-					found = 0
-					for elem in self.mines:
-						if elem == (i, j):
-							found = 1
-					for elem in self.moves_made:
-						if elem == (i, j):
-							found = 1
-					if found == 0:
+					if (i, j) not in self.mines and (i, j) not in self.moves_made:
 						remain.add((i, j))
 		# if elements have been collected a random index will be choosen
 		# and we will loop over each element in 'remain' and return the